@@ -61,23 +61,32 @@ class Neo4jConnection:
         return self._driver
 
     def run_query(
-        self, query: str, params: Optional[Dict[str, Any]] = None
+        self,
+        query: str,
+        params: Optional[Dict[str, Any]] = None,
+        session: Optional[Session] = None,
     ) -> List[Dict[str, Any]]:
         """Run a Cypher query against the Neo4j database.
 
         Args:
             query: Cypher query to execute
             params: Parameters for the query
+            session: Optional open session to run the query on. If None, a
+                session is opened and closed for this query only.
 
         Returns:
             List of results as dictionaries
         """
-        if self._driver is None:
-            self.connect()
-
         if params is None:
             params = {}
 
+        if session is not None:
+            result = session.run(query, params)
+            return [dict(record) for record in result]
+
+        if self._driver is None:
+            self.connect()
+
         with self._driver.session() as session:
             result = session.run(query, params)
             return [dict(record) for record in result]
@@ -134,6 +143,63 @@ class Neo4jConnection:
         
         return nodes
 
+    def get_nodes_by_types(self, node_types: List[str]) -> List[Node]:
+        """Get all nodes of several types in a single query.
+        
+        Args:
+            node_types: Types of node to get (any of FailureMode, Observation
+                and SensorReading)
+            
+        Returns:
+            List of Node objects
+        """
+        type_map = {
+            "FailureMode": FailureMode,
+            "Observation": Observation,
+            "SensorReading": SensorReading
+        }
+        
+        for node_type in node_types:
+            if node_type not in type_map:
+                raise ValueError(f"Unknown node type: {node_type}")
+        if not node_types:
+            return []
+            
+        # Labels can't be parameters; OR-ing validated labels lets the planner
+        # union the label lookup scans in one round trip
+        label_filter = " OR ".join(f"n:{node_type}" for node_type in node_types)
+        query = f"""
+        MATCH (n)
+        WHERE {label_filter}
+        RETURN 
+            elementId(n) as id,
+            labels(n) as labels,
+            n.name as name,
+            n.description as description,
+            n.unit as unit
+        """
+        
+        results = self.run_query(query)
+        
+        nodes = []
+        for row in results:
+            node_type = next(label for label in row["labels"] if label in node_types)
+            if node_type == "SensorReading":
+                nodes.append(SensorReading(
+                    id=row["id"],
+                    name=row["name"],
+                    description=row["description"],
+                    unit=row["unit"]
+                ))
+            else:
+                nodes.append(type_map[node_type](
+                    id=row["id"],
+                    name=row["name"],
+                    description=row["description"]
+                ))
+        
+        return nodes
+
     def save_node(self, node: Node) -> str:
         """Save a node to the database.
         
@@ -183,34 +249,17 @@ class Neo4jConnection:
             The relationship ID
         """
         # Ensure both source and destination have IDs
-        if not relationship.source.id or not relationship.dest.id:
+        if not relationship.has_valid_ids():
             raise ValueError("Both source and destination nodes must have IDs")
             
         # Extract properties based on relationship type
-        properties = {}
-        
         if isinstance(relationship, EvidenceLink):
             rel_type = "EVIDENCE_FOR"
-            properties = {
-                "when_true_strength": relationship.when_true_strength.value,
-                "when_false_strength": relationship.when_false_strength.value
-            }
-            
-            # Add additional properties for EvidenceLink
-            if relationship.operator:
-                properties["operator"] = relationship.operator.value
-                
-            if relationship.threshold is not None:
-                properties["threshold"] = relationship.threshold
-                
-            if relationship.name:
-                properties["name"] = relationship.name
-                
-            if relationship.rationale:
-                properties["rationale"] = relationship.rationale
+            properties = relationship.cypher_properties()
         else:
             # CausesLink has no additional properties
             rel_type = "CAUSES"
+            properties = {}
             
         # Create the relationship
         properties_str = ""
@@ -226,8 +275,8 @@ class Neo4jConnection:
         """
         
         params = {
-            "source_id": relationship.source.id,
-            "dest_id": relationship.dest.id,
+            "source_id": relationship.get_source_id(),
+            "dest_id": relationship.get_dest_id(),
             **properties
         }
         
@@ -4,13 +4,98 @@ import json
 import logging
 from typing import Dict, Any, List
 
-from telltale.core.models import (
-    FailureMode, Observation, SensorReading,
-    CausesLink, EvidenceLink, EvidenceStrength, ComparisonOperator, Node
-)
+from neo4j import Session
 
 logger = logging.getLogger(__name__)
 
+# --- Basic scenarios (dead battery, mute mode, etc) ---
+_BASIC_FAILURE_MODES = [
+    {"name": "Dead Battery", "description": "Battery voltage is too low to power the device"},
+    {"name": "Mute Mode", "description": "Device is in mute mode"},
+    {"name": "Speaker Broken", "description": "Speaker hardware is damaged or disconnected"},
+    {"name": "Device Off", "description": "Device is powered off"},
+]
+
+_BASIC_OBSERVATIONS = [
+    {"name": "No Music", "description": "No sound is playing from the device"},
+    {"name": "Buzz or Hiss", "description": "Unwanted noise coming from the speaker"},
+]
+
+_BASIC_SENSOR_READINGS = [
+    {"name": "battery_voltage", "unit": "V", "description": "Current battery voltage"},
+    {"name": "switch_status", "unit": "enum", "description": "Position of the mode switch",
+     "value_descriptions": '{"0": "OFF", "1": "ON", "2": "MUTE"}'},
+]
+
+_BASIC_CAUSES = [
+    {"source": "Dead Battery", "dest": "No Music"},
+    {"source": "Mute Mode", "dest": "No Music"},
+    {"source": "Speaker Broken", "dest": "No Music"},
+    {"source": "Speaker Broken", "dest": "Buzz or Hiss"},
+    {"source": "Device Off", "dest": "No Music"},
+]
+
+_BASIC_EVIDENCE = [
+    {"source": "battery_voltage", "dest": "Dead Battery", "name": "Low battery voltage",
+     "when_true_strength": "confirms", "when_false_strength": "rules_out",
+     "operator": "<", "threshold": 4.0},
+    {"source": "switch_status", "dest": "Device Off", "name": "Switch position indicates device state",
+     "when_true_strength": "confirms", "when_false_strength": "suggests_against",
+     "operator": "=", "threshold": 0},  # OFF state
+    {"source": "switch_status", "dest": "Mute Mode", "name": "Switch position indicates mute state",
+     "when_true_strength": "confirms", "when_false_strength": "suggests_against",
+     "operator": "=", "threshold": 2},  # MUTE state
+    {"source": "Buzz or Hiss", "dest": "Speaker Broken", "name": "Buzzing or hissing sound",
+     "when_true_strength": "suggests", "when_false_strength": "inconclusive"},
+    {"source": "No Music", "dest": "Dead Battery", "name": "No music playing",
+     "when_true_strength": "suggests", "when_false_strength": "rules_out"},
+    {"source": "No Music", "dest": "Mute Mode", "name": "No music playing",
+     "when_true_strength": "suggests", "when_false_strength": "inconclusive"},
+    {"source": "No Music", "dest": "Device Off", "name": "No music playing",
+     "when_true_strength": "suggests", "when_false_strength": "rules_out"},
+]
+
+# --- Broken speaker wire scenario ---
+_SPEAKER_WIRE_FAILURE_MODES = [
+    {"name": "Broken Speaker Wire",
+     "description": "The wire connecting the speaker to the circuit board is broken"},
+]
+
+_SPEAKER_WIRE_OBSERVATIONS = [
+    {"name": "Intermittent Sound", "description": "Sound cuts in and out when the toy is moved"},
+    {"name": "Sound Only on One Side", "description": "Sound only comes from one speaker"},
+    {"name": "No Music", "description": "No sound is playing from the device"},
+]
+
+_SPEAKER_WIRE_SENSOR_READINGS = [
+    {"name": "speaker_impedance", "unit": "ohm",
+     "description": "Measured impedance of the speaker circuit"},
+    {"name": "speaker_continuity", "unit": "bool",
+     "description": "Continuity test result for speaker wiring",
+     "value_descriptions": '{"0": "No Continuity", "1": "Continuity OK"}'},
+]
+
+_SPEAKER_WIRE_CAUSES = [
+    {"source": "Broken Speaker Wire", "dest": "Intermittent Sound"},
+    {"source": "Broken Speaker Wire", "dest": "Sound Only on One Side"},
+    {"source": "Broken Speaker Wire", "dest": "No Music"},
+]
+
+_SPEAKER_WIRE_EVIDENCE = [
+    {"source": "speaker_impedance", "dest": "Broken Speaker Wire", "name": "High speaker impedance",
+     "when_true_strength": "confirms", "when_false_strength": "suggests_against",
+     "operator": ">", "threshold": 1000},  # Very high impedance indicates broken wire
+    {"source": "speaker_continuity", "dest": "Broken Speaker Wire", "name": "Speaker wire continuity test",
+     "when_true_strength": "rules_out", "when_false_strength": "confirms",
+     "operator": "=", "threshold": 1},  # 1 means continuity is OK
+    {"source": "Intermittent Sound", "dest": "Broken Speaker Wire", "name": "Sound cuts in and out",
+     "when_true_strength": "suggests", "when_false_strength": "inconclusive"},
+    {"source": "Sound Only on One Side", "dest": "Broken Speaker Wire", "name": "Sound only from one speaker",
+     "when_true_strength": "suggests", "when_false_strength": "inconclusive"},
+    {"source": "No Music", "dest": "Broken Speaker Wire", "name": "No music playing",
+     "when_true_strength": "suggests", "when_false_strength": "rules_out"},
+]
+
 class ExampleScenarios:
     """Class containing methods to create example diagnostic scenarios."""
     
@@ -18,297 +103,87 @@ class ExampleScenarios:
         """Initialize with a database connection."""
         self.db = db
 
-    def create_node(self, node: Node) -> Node:
-        """Create a node in the database and update its ID.
+    def _merge_nodes(self, label: str, rows: List[Dict[str, Any]], session: Session) -> None:
+        """Merge a batch of nodes of one label, keyed on name.
         
         Args:
-            node: The node to create
-            
-        Returns:
-            The node with its ID updated
+            label: Node label (FailureMode, Observation or SensorReading)
+            rows: Node property dicts, each with at least a 'name'
+            session: Open session to run the write on
         """
-        # Build query dynamically based on non-null properties
-        props = {
-            "name": node.name,
-            "description": node.description
-        }
-        
-        # Add additional properties for SensorReading
-        if isinstance(node, SensorReading):
-            if node.unit:
-                props["unit"] = node.unit
-            if node.value_descriptions:
-                props["value_descriptions"] = node.value_descriptions
-        
-        # Create property string for query
-        prop_str = ", ".join(f"{k}: ${k}" for k in props.keys())
-        
-        # Get node type from the class name
-        node_type = node.__class__.__name__
-        
-        result = self.db.run_query(
+        self.db.run_query(
             f"""
-            MERGE (n:{node_type} {{{prop_str}}})
-            RETURN elementId(n) as node_id
+            UNWIND $rows AS row
+            MERGE (n:{label} {{name: row.name}})
+            SET n += row
             """,
-            props
+            {"rows": rows},
+            session=session
         )
-        node.id = result[0]["node_id"]
-        return node
 
-    def create_relationship(self, rel: CausesLink | EvidenceLink) -> None:
-        """Create a relationship in the database.
+    def _merge_causes(self, rows: List[Dict[str, Any]], session: Session) -> None:
+        """Merge a batch of CAUSES relationships from failure modes to observations.
         
         Args:
-            rel: The relationship to create
+            rows: Dicts with 'source' (failure mode name) and 'dest' (observation name)
+            session: Open session to run the write on
         """
-        # Ensure both nodes have IDs
-        if not rel.has_valid_ids():
-            raise ValueError("Both source and dest nodes must have IDs")
+        self.db.run_query(
+            """
+            UNWIND $rows AS row
+            MATCH (source:FailureMode {name: row.source})
+            MATCH (dest:Observation {name: row.dest})
+            MERGE (source)-[:CAUSES]->(dest)
+            """,
+            {"rows": rows},
+            session=session
+        )
+
+    def _merge_evidence(self, rows: List[Dict[str, Any]], session: Session) -> None:
+        """Merge a batch of EVIDENCE_FOR relationships into failure modes.
         
-        if isinstance(rel, CausesLink):
-            self.db.run_query(
-                """
-                MATCH (source), (dest)
-                WHERE elementId(source) = $source_id AND elementId(dest) = $dest_id
-                MERGE (source)-[:CAUSES]->(dest)
-                """,
-                {"source_id": rel.get_source_id(), "dest_id": rel.get_dest_id()}
-            )
-        elif isinstance(rel, EvidenceLink):
-            # Build relationship properties
-            rel_props = {
-                "when_true_strength": rel.when_true_strength.value,
-                "when_false_strength": rel.when_false_strength.value,
-                "name": rel.name
-            }
-            
-            if rel.operator:
-                rel_props["operator"] = rel.operator.value
-            
-            if rel.threshold is not None:
-                rel_props["threshold"] = rel.threshold
-            
-            # Create property string for query
-            prop_str = ", ".join(f"{k}: ${k}" for k in rel_props.keys())
-            
-            self.db.run_query(
-                f"""
-                MATCH (source), (dest)
-                WHERE elementId(source) = $source_id AND elementId(dest) = $dest_id
-                MERGE (source)-[r:EVIDENCE_FOR {{{prop_str}}}]->(dest)
-                """,
-                {
-                    "source_id": rel.get_source_id(),
-                    "dest_id": rel.get_dest_id(),
-                    **rel_props
-                }
-            )
+        Args:
+            rows: Dicts with 'source' (observation or sensor name), 'dest'
+                (failure mode name), 'name', the two strengths and optionally
+                'operator' and 'threshold'
+            session: Open session to run the write on
+        """
+        self.db.run_query(
+            """
+            UNWIND $rows AS row
+            MATCH (source) WHERE (source:Observation OR source:SensorReading)
+                AND source.name = row.source
+            MATCH (dest:FailureMode {name: row.dest})
+            MERGE (source)-[r:EVIDENCE_FOR {name: row.name}]->(dest)
+            SET r.when_true_strength = row.when_true_strength,
+                r.when_false_strength = row.when_false_strength,
+                r.operator = row.operator,
+                r.threshold = row.threshold
+            """,
+            {"rows": rows},
+            session=session
+        )
 
     def add_basic_scenarios(self) -> None:
         """Add the basic diagnostic scenarios (dead battery, mute mode, etc)."""
-        # Create FailureMode nodes and get their IDs
-        failure_modes = [
-            FailureMode(name="Dead Battery", description="Battery voltage is too low to power the device"),
-            FailureMode(name="Mute Mode", description="Device is in mute mode"),
-            FailureMode(name="Speaker Broken", description="Speaker hardware is damaged or disconnected"),
-            FailureMode(name="Device Off", description="Device is powered off")
-        ]
-        
-        # Create nodes in DB and update with IDs
-        failure_modes = [self.create_node(fm) for fm in failure_modes]
-        
-        # Create Observation nodes and get their IDs
-        observations = [
-            Observation(name="No Music", description="No sound is playing from the device"),
-            Observation(name="Buzz or Hiss", description="Unwanted noise coming from the speaker")
-        ]
-        
-        observations = [self.create_node(obs) for obs in observations]
-        
-        # Create SensorReading nodes and get their IDs
-        sensor_readings = [
-            SensorReading(name="battery_voltage", unit="V", description="Current battery voltage"),
-            SensorReading(name="switch_status", unit="enum", description="Position of the mode switch",
-                         value_descriptions='{"0": "OFF", "1": "ON", "2": "MUTE"}')
-        ]
-        
-        sensor_readings = [self.create_node(sr) for sr in sensor_readings]
-        
-        # Create CAUSES relationships
-        causes_links = [
-            CausesLink(
-                source=failure_modes[0],  # Dead Battery
-                dest=observations[0]  # No Music
-            ),
-            CausesLink(
-                source=failure_modes[1],  # Mute Mode
-                dest=observations[0]  # No Music
-            ),
-            CausesLink(
-                source=failure_modes[2],  # Speaker Broken
-                dest=observations[0]  # No Music
-            ),
-            CausesLink(
-                source=failure_modes[2],  # Speaker Broken
-                dest=observations[1]  # Buzz or Hiss
-            ),
-            CausesLink(
-                source=failure_modes[3],  # Device Off
-                dest=observations[0]  # No Music
-            )
-        ]
-        
-        for link in causes_links:
-            self.create_relationship(link)
-        
-        # Create EVIDENCE_FOR relationships
-        evidence_links = [
-            EvidenceLink(
-                source=sensor_readings[0],  # battery_voltage
-                dest=failure_modes[0],  # Dead Battery
-                when_true_strength=EvidenceStrength.CONFIRMS,
-                when_false_strength=EvidenceStrength.RULES_OUT,
-                operator=ComparisonOperator.LESS_THAN,
-                threshold=4.0,
-                name="Low battery voltage"
-            ),
-            EvidenceLink(
-                source=sensor_readings[1],  # switch_status
-                dest=failure_modes[3],  # Device Off
-                when_true_strength=EvidenceStrength.CONFIRMS,
-                when_false_strength=EvidenceStrength.SUGGESTS_AGAINST,
-                operator=ComparisonOperator.EQUALS,
-                threshold=0,  # OFF state
-                name="Switch position indicates device state"
-            ),
-            EvidenceLink(
-                source=sensor_readings[1],  # switch_status
-                dest=failure_modes[1],  # Mute Mode
-                when_true_strength=EvidenceStrength.CONFIRMS,
-                when_false_strength=EvidenceStrength.SUGGESTS_AGAINST,
-                operator=ComparisonOperator.EQUALS,
-                threshold=2,  # MUTE state
-                name="Switch position indicates mute state"
-            ),
-            EvidenceLink(
-                source=observations[1],  # Buzz or Hiss
-                dest=failure_modes[2],  # Speaker Broken
-                when_true_strength=EvidenceStrength.SUGGESTS,
-                when_false_strength=EvidenceStrength.INCONCLUSIVE,
-                name="Buzzing or hissing sound"
-            ),
-            EvidenceLink(
-                source=observations[0],  # No Music
-                dest=failure_modes[0],  # Dead Battery
-                when_true_strength=EvidenceStrength.SUGGESTS,
-                when_false_strength=EvidenceStrength.RULES_OUT,
-                name="No music playing"
-            ),
-            EvidenceLink(
-                source=observations[0],  # No Music
-                dest=failure_modes[1],  # Mute Mode
-                when_true_strength=EvidenceStrength.SUGGESTS,
-                when_false_strength=EvidenceStrength.INCONCLUSIVE,
-                name="No music playing"
-            ),
-            EvidenceLink(
-                source=observations[0],  # No Music
-                dest=failure_modes[3],  # Device Off
-                when_true_strength=EvidenceStrength.SUGGESTS,
-                when_false_strength=EvidenceStrength.RULES_OUT,
-                name="No music playing"
-            )
-        ]
-        
-        for link in evidence_links:
-            self.create_relationship(link)
+        with self.db.get_driver().session() as session:
+            self._merge_nodes("FailureMode", _BASIC_FAILURE_MODES, session)
+            self._merge_nodes("Observation", _BASIC_OBSERVATIONS, session)
+            self._merge_nodes("SensorReading", _BASIC_SENSOR_READINGS, session)
+            self._merge_causes(_BASIC_CAUSES, session)
+            self._merge_evidence(_BASIC_EVIDENCE, session)
 
         logger.info("Basic scenarios have been added successfully")
 
     def add_broken_speaker_wire_scenario(self) -> None:
         """Add the broken speaker wire diagnostic scenario."""
-        # Create nodes
-        failure_mode = self.create_node(
-            FailureMode(name="Broken Speaker Wire", 
-                       description="The wire connecting the speaker to the circuit board is broken")
-        )
-        
-        observations = [
-            self.create_node(Observation(name="Intermittent Sound", 
-                                       description="Sound cuts in and out when the toy is moved")),
-            self.create_node(Observation(name="Sound Only on One Side", 
-                                       description="Sound only comes from one speaker")),
-            self.create_node(Observation(name="No Music", 
-                                       description="No sound is playing from the device"))
-        ]
-        
-        sensor_readings = [
-            self.create_node(SensorReading(name="speaker_impedance", 
-                                         unit="ohm",
-                                         description="Measured impedance of the speaker circuit")),
-            self.create_node(SensorReading(name="speaker_continuity", 
-                                         unit="bool",
-                                         description="Continuity test result for speaker wiring",
-                                         value_descriptions='{"0": "No Continuity", "1": "Continuity OK"}'))
-        ]
-        
-        # Create CAUSES relationships
-        causes_links = [
-            CausesLink(source=failure_mode, dest=observations[0]),  # Intermittent Sound
-            CausesLink(source=failure_mode, dest=observations[1]),  # Sound Only on One Side
-            CausesLink(source=failure_mode, dest=observations[2])   # No Music
-        ]
-        
-        for link in causes_links:
-            self.create_relationship(link)
-        
-        # Create EVIDENCE_FOR relationships
-        evidence_links = [
-            EvidenceLink(
-                source=sensor_readings[0],  # speaker_impedance
-                dest=failure_mode,
-                when_true_strength=EvidenceStrength.CONFIRMS,
-                when_false_strength=EvidenceStrength.SUGGESTS_AGAINST,
-                operator=ComparisonOperator.GREATER_THAN,
-                threshold=1000,  # Very high impedance indicates broken wire
-                name="High speaker impedance"
-            ),
-            EvidenceLink(
-                source=sensor_readings[1],  # speaker_continuity
-                dest=failure_mode,
-                when_true_strength=EvidenceStrength.RULES_OUT,
-                when_false_strength=EvidenceStrength.CONFIRMS,
-                operator=ComparisonOperator.EQUALS,
-                threshold=1,  # 1 means continuity is OK
-                name="Speaker wire continuity test"
-            ),
-            EvidenceLink(
-                source=observations[0],  # Intermittent Sound
-                dest=failure_mode,
-                when_true_strength=EvidenceStrength.SUGGESTS,
-                when_false_strength=EvidenceStrength.INCONCLUSIVE,
-                name="Sound cuts in and out"
-            ),
-            EvidenceLink(
-                source=observations[1],  # Sound Only on One Side
-                dest=failure_mode,
-                when_true_strength=EvidenceStrength.SUGGESTS,
-                when_false_strength=EvidenceStrength.INCONCLUSIVE,
-                name="Sound only from one speaker"
-            ),
-            EvidenceLink(
-                source=observations[2],  # No Music
-                dest=failure_mode,
-                when_true_strength=EvidenceStrength.SUGGESTS,
-                when_false_strength=EvidenceStrength.RULES_OUT,
-                name="No music playing"
-            )
-        ]
-        
-        for link in evidence_links:
-            self.create_relationship(link)
-        
+        with self.db.get_driver().session() as session:
+            self._merge_nodes("FailureMode", _SPEAKER_WIRE_FAILURE_MODES, session)
+            self._merge_nodes("Observation", _SPEAKER_WIRE_OBSERVATIONS, session)
+            self._merge_nodes("SensorReading", _SPEAKER_WIRE_SENSOR_READINGS, session)
+            self._merge_causes(_SPEAKER_WIRE_CAUSES, session)
+            self._merge_evidence(_SPEAKER_WIRE_EVIDENCE, session)
+
         logger.info("Broken speaker wire scenario has been added successfully")
 
 
@@ -10,7 +10,10 @@ import os
 import json
 from datetime import datetime
 
-from .models import Node, Relationship, EvidenceStrength, ComparisonOperator, CausesLink, EvidenceLink
+from .models import (
+    Node, Relationship, EvidenceStrength, ComparisonOperator, CausesLink, EvidenceLink,
+    EVIDENCE_STRENGTHS, COMPARISON_OPERATORS
+)
 
 from .prompts.node_identification import SYSTEM_PROMPT as NODE_SYSTEM_PROMPT, get_node_prompt
 from .prompts.failure_mode import SYSTEM_PROMPT as FAILURE_SYSTEM_PROMPT, get_failure_mode_prompt
@@ -81,6 +84,20 @@ class LLMParser:
         self.relationship_parser = PydanticOutputParser(pydantic_object=RelationshipFormationOutput)
         self.evidence_parser = PydanticOutputParser(pydantic_object=EvidenceStrengthOutput)
     
+    def _stream_content(self, messages: List[Any]) -> str:
+        """Stream an LLM response and return its assembled text content.
+        
+        Args:
+            messages: Messages to send to the LLM
+            
+        Returns:
+            The full response content
+        """
+        chunks = []
+        for chunk in self.llm.stream(messages):
+            chunks.append(chunk.content)
+        return "".join(chunks)
+
     def parse_text(self, text: str) -> Dict[str, Any]:
         """Parse natural language text into diagnostic nodes and relationships using a manual chain.
         
@@ -100,8 +117,8 @@ class LLMParser:
             SystemMessage(content=NODE_SYSTEM_PROMPT),
             HumanMessage(content=node_user_prompt)
         ]
-        node_response = self.llm.invoke(node_messages)
-        node_result = self.node_parser.parse(node_response.content)
+        node_content = self._stream_content(node_messages)
+        node_result = self.node_parser.parse(node_content)
         print(f"Identified {len(node_result.nodes)} explicit nodes.")
 
         print("\n--- Step 2: Implied Failure Modes ---")
@@ -113,8 +130,8 @@ class LLMParser:
             SystemMessage(content=FAILURE_SYSTEM_PROMPT),
             HumanMessage(content=failure_user_prompt)
         ]
-        failure_response = self.llm.invoke(failure_messages)
-        failure_result = self.failure_mode_parser.parse(failure_response.content)
+        failure_content = self._stream_content(failure_messages)
+        failure_result = self.failure_mode_parser.parse(failure_content)
         print(f"Identified {len(failure_result.nodes)} implied failure modes.")
 
         # Combine nodes
@@ -136,16 +153,16 @@ class LLMParser:
             SystemMessage(content=RELATIONSHIP_SYSTEM_PROMPT),
             HumanMessage(content=relationship_user_prompt)
         ]
-        relationship_response = self.llm.invoke(relationship_messages)
+        relationship_content = self._stream_content(relationship_messages)
         # Handle potential parsing errors gracefully for debugging
         try:
-            relationship_result = self.relationship_parser.parse(relationship_response.content)
+            relationship_result = self.relationship_parser.parse(relationship_content)
             print(f"Formed {len(relationship_result.relationships)} initial relationships.")
         except Exception as e:
             print("\n" + "-"*30 + " RELATIONSHIP PARSING FAILED " + "-"*30)
             print(f"Error parsing Relationship Formation Output: {e}")
             print("Raw output that failed parsing:")
-            print(relationship_response.content)
+            print(relationship_content)
             print("-" * 80)
             raise e
 
@@ -161,16 +178,16 @@ class LLMParser:
             SystemMessage(content=EVIDENCE_SYSTEM_PROMPT),
             HumanMessage(content=evidence_user_prompt)
         ]
-        evidence_response = self.llm.invoke(evidence_messages)
+        evidence_content = self._stream_content(evidence_messages)
         # Handle potential parsing errors gracefully for debugging
         try:
-            evidence_result = self.evidence_parser.parse(evidence_response.content)
+            evidence_result = self.evidence_parser.parse(evidence_content)
             print(f"Assessed evidence for {len(evidence_result.relationships)} final relationships.")
         except Exception as e:
             print("\n" + "-"*30 + " EVIDENCE PARSING FAILED " + "-"*30)
             print(f"Error parsing Evidence Strength Output: {e}")
             print("Raw output that failed parsing:")
-            print(evidence_response.content)
+            print(evidence_content)
             print("-" * 80)
             raise e
 
@@ -195,16 +212,19 @@ class LLMParser:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"parser_results_{timestamp}.json"
 
-        # Ensure nodes and relationships are serializable (use model_dump)
-        # Pass mode='json' to handle types like Enums correctly for JSON
-        serializable_results = {
-            "nodes": [node.model_dump(mode='json', exclude_none=True) if isinstance(node, BaseModel) else node for node in results.get("nodes", [])],
-            "relationships": [rel.model_dump(mode='json', exclude_none=True) if isinstance(rel, BaseModel) else rel for rel in results.get("relationships", [])]
-        }
+        # Serialize models straight to JSON text with pydantic-core, skipping the
+        # intermediate dicts; plain dicts fall back to json.dumps
+        def to_json(item: Any) -> str:
+            if isinstance(item, BaseModel):
+                return item.model_dump_json(exclude_none=True)
+            return json.dumps(item, ensure_ascii=False)
+
+        nodes_json = "[" + ",".join(to_json(node) for node in results.get("nodes", [])) + "]"
+        rels_json = "[" + ",".join(to_json(rel) for rel in results.get("relationships", [])) + "]"
 
         try:
             with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(serializable_results, f, ensure_ascii=False, indent=4)
+                f.write('{"nodes":' + nodes_json + ',"relationships":' + rels_json + '}')
             print(f"Results saved to {filename}")
             return filename
         except IOError as e:
@@ -220,10 +240,8 @@ class LLMParser:
         Raises:
             ValueError: If strength is not valid
         """
-        # Ensure EvidenceStrength enum values are used if available
-        valid_strengths = [e.value for e in EvidenceStrength] if hasattr(EvidenceStrength, 'value') else list(EvidenceStrength) # Adapt if EvidenceStrength is simple Enum
-        if strength not in valid_strengths:
-            valid = ", ".join(valid_strengths)
+        if strength not in EVIDENCE_STRENGTHS:
+            valid = ", ".join(EVIDENCE_STRENGTHS)
             raise ValueError(
                 f"Invalid evidence strength '{strength}'. Must be one of: {valid}"
             )
@@ -237,10 +255,8 @@ class LLMParser:
         Raises:
             ValueError: If operator is not valid
         """
-        # Ensure ComparisonOperator enum values are used if available
-        valid_operators = [o.value for o in ComparisonOperator] if hasattr(ComparisonOperator, 'value') else list(ComparisonOperator) # Adapt if ComparisonOperator is simple Enum
-        if operator not in valid_operators:
-            valid = ", ".join(valid_operators)
+        if operator not in COMPARISON_OPERATORS:
+            valid = ", ".join(o.value for o in ComparisonOperator)
             raise ValueError(
                 f"Invalid operator '{operator}'. Must be one of: {valid}"
             ) 
\ No newline at end of file
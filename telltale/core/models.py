@@ -1,8 +1,9 @@
 """Core data models for the diagnostic system."""
 
 from enum import Enum
-from typing import List, Optional, Union, Dict, Any, Literal
-from pydantic import BaseModel, Field
+from operator import attrgetter
+from typing import List, Optional, Union, Dict, Any, Literal, Tuple
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class EvidenceStrength(str, Enum):
@@ -30,6 +31,12 @@ class ComparisonOperator(str, Enum):
         return super()._missing_(value)
 
 
+# Value -> member lookups, built once at import
+EVIDENCE_STRENGTHS: Dict[str, EvidenceStrength] = {m.value: m for m in EvidenceStrength}
+COMPARISON_OPERATORS: Dict[str, ComparisonOperator] = {m.value: m for m in ComparisonOperator}
+COMPARISON_OPERATORS["=="] = ComparisonOperator.EQUALS  # alias accepted by _missing_
+
+
 # Base Classes
 class Node(BaseModel):
     """Base class for all graph nodes."""
@@ -41,6 +48,9 @@ class Node(BaseModel):
 
 class Relationship(BaseModel):
     """Base class for all relationships."""
+    # Store enums as their string values so model_dump skips the enum -> str step
+    model_config = ConfigDict(use_enum_values=True)
+
     id: Optional[str] = None  # Neo4j elementId
     type: str
     source: Node  # Source node object
@@ -81,6 +91,9 @@ class SensorReading(Node):
 # --- Relationship Properties ---
 class EvidenceProperties(BaseModel):
     """Properties specific to EvidenceLink relationships."""
+    # Strength/operator fields hold plain strings (e.g. "confirms", "<") after validation
+    model_config = ConfigDict(use_enum_values=True)
+
     when_true_strength: Optional[EvidenceStrength] = None
     when_false_strength: Optional[EvidenceStrength] = None
     operator: Optional[ComparisonOperator] = None
@@ -90,17 +103,74 @@ class EvidenceProperties(BaseModel):
     # Removed 'name' and 'rationale' as they are now specific to true/false cases
 
 
+# (property name, getter) for each EvidenceProperties field, in declaration order
+EVIDENCE_FIELDS = tuple((name, attrgetter(name)) for name in EvidenceProperties.model_fields)
+
+
 # Relationship Types
 class CausesLink(Relationship):
     """Represents a causal relationship between a failure mode and an observation."""
     type: Literal["CAUSES"] = "CAUSES" # Match expected output casing
 
+    def cypher_properties(self) -> Optional[Dict[str, Any]]:
+        """Properties to store on the Neo4j relationship (CAUSES has none)."""
+        return None
+
+    def to_cypher_params(self, source_id: str, target_id: str) -> Tuple[str, Dict[str, Any]]:
+        """Build the Cypher MERGE for this relationship.
+        
+        Args:
+            source_id: Neo4j elementId of the source node
+            target_id: Neo4j elementId of the target node
+            
+        Returns:
+            Tuple of (query, params); the query returns the relationship's rel_id
+        """
+        query = """
+        MATCH (source) WHERE elementId(source) = $source_id
+        MATCH (target) WHERE elementId(target) = $target_id
+        MERGE (source)-[r:CAUSES]->(target)
+        RETURN elementId(r) as rel_id
+        """
+        return query, {"source_id": source_id, "target_id": target_id}
+
 
 class EvidenceLink(Relationship):
     """Represents diagnostic evidence between an observation/sensor and a failure mode."""
     type: Literal["EVIDENCE_FOR"] = "EVIDENCE_FOR" # Match expected output casing
     properties: Optional[EvidenceProperties] = None # Nested properties
 
+    def cypher_properties(self) -> Dict[str, Any]:
+        """Properties to store on the Neo4j relationship, skipping unset ones."""
+        props = self.properties
+        if not props:
+            return {}
+        values = ((name, get(props)) for name, get in EVIDENCE_FIELDS)
+        return {name: value for name, value in values if value is not None}
+
+    def to_cypher_params(self, source_id: str, target_id: str) -> Tuple[str, Dict[str, Any]]:
+        """Build the Cypher MERGE for this relationship, replacing its properties.
+        
+        Args:
+            source_id: Neo4j elementId of the source node
+            target_id: Neo4j elementId of the target node
+            
+        Returns:
+            Tuple of (query, params); the query returns the relationship's rel_id
+        """
+        query = """
+        MATCH (source) WHERE elementId(source) = $source_id
+        MATCH (target) WHERE elementId(target) = $target_id
+        MERGE (source)-[r:EVIDENCE_FOR]->(target)
+        SET r = $properties
+        RETURN elementId(r) as rel_id
+        """
+        return query, {
+            "source_id": source_id,
+            "target_id": target_id,
+            "properties": self.cypher_properties()
+        }
+
 
 # Diagnostic Results (for API responses)
 class DiagnosticResult(BaseModel):
@@ -1,11 +1,18 @@
 """Natural language interface for managing nodes and relationships in the knowledge graph."""
 
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import List, Dict, Any, Optional, Tuple, Union
 
+import numpy as np
+
+from neo4j import Session, Transaction, WRITE_ACCESS
+
 from .models import (
     Node, FailureMode, Observation, SensorReading,
-    EvidenceLink, CausesLink, EvidenceStrength, ComparisonOperator
+    EvidenceLink, CausesLink, EvidenceProperties, EvidenceStrength
 )
 from .database import Neo4jConnection
 from .semantic_search import NodeVectorIndex, SearchResult
@@ -16,40 +23,211 @@ logger = logging.getLogger(__name__)
 NodeType = Union[FailureMode, Observation, SensorReading]
 RelationType = Union[CausesLink, EvidenceLink]
 
+NODE_CLASSES = {cls.__name__: cls for cls in (FailureMode, Observation, SensorReading)}
+
+# Rows committed per inner transaction when bulk writes run concurrently
+BULK_BATCH_SIZE = 500
+
+
+class SimilarNodeError(ValueError):
+    """Raised when a node being added is too similar to an existing node."""
+
+    def __init__(self, existing_id: str, existing_name: str, score: float):
+        """Initialize the error.
+        
+        Args:
+            existing_id: Neo4j ID of the existing similar node
+            existing_name: Name of the existing similar node
+            score: Similarity score of the match
+        """
+        super().__init__(f"Similar node exists: {existing_name} (similarity: {score:.2f})")
+        self.existing_id = existing_id
+        self.existing_name = existing_name
+        self.score = score
+
+
 class NodeManager:
     """Manages natural language creation of nodes and relationships."""
 
-    def __init__(self, db: Neo4jConnection, parser: LLMParser = None, similarity_threshold: float = 0.8, initialize_vector_index: bool = True):
+    def __init__(self, db: Neo4jConnection, parser: LLMParser = None, similarity_threshold: float = 0.8, initialize_vector_index: bool = True,
+                 concurrent_writes: bool = False, index_dir: Optional[str] = None):
         """Initialize the node manager.
         
         Args:
             db: Neo4j database connection
             parser: LLM parser instance to use. If None, a new one will be created.
             similarity_threshold: Threshold for considering nodes similar (0.0 to 1.0)
-            initialize_vector_index: Whether to initialize and load the vector index.
+            initialize_vector_index: Whether to build the vector index (in a background
+                thread; see wait_for_vector_index).
+            concurrent_writes: Whether bulk writes should run as
+                CALL { ... } IN CONCURRENT TRANSACTIONS (requires Neo4j 5.21+).
+            index_dir: Directory to persist the vector index in. If given, a saved
+                index is reused on startup and only changed nodes are re-embedded.
         """
         self.db = db
         self.parser = parser or LLMParser()
         self.similarity_threshold = similarity_threshold
+        self.concurrent_writes = concurrent_writes
+        self.index_dir = index_dir
         self.vector_index = None
-
+        # Long-lived write session, opened on first write (see _write). Sessions
+        # are not thread-safe, so writes on it are serialized by _write_lock
+        self._write_session: Optional[Session] = None
+        self._write_lock = threading.Lock()
+        # Search results keyed by search text; cleared whenever the index changes
+        self._search_cache = lru_cache(maxsize=4096)(self._search_index)
+        # Guards adding to the vector index and publishing it. Nodes written while
+        # the background build runs are held here and indexed when it finishes;
+        # None when no build is running
+        self._index_lock = threading.Lock()
+        self._pending_index: Optional[List[NodeType]] = [] if initialize_vector_index else None
+
+        if concurrent_writes:
+            # Name uniqueness constraints keep concurrent MERGEs from contending on locks
+            self.db.initialize_schema()
+
+        # Set once the vector index is built (or will not be built)
+        self._vector_ready = threading.Event()
         if initialize_vector_index:
+            # Build in the background so construction doesn't wait on embedding the
+            # whole graph; until then similarity checks are skipped
+            threading.Thread(target=self._build_vector_index, daemon=True).start()
+        else:
+            self._vector_ready.set()
+
+    def _build_vector_index(self) -> None:
+        """Build the vector index from the graph and publish it as self.vector_index."""
+        try:
+            vector_index = NodeVectorIndex()
+            # Load existing nodes into vector index
+            logger.info("Initializing and loading vector index...")
+            if self.index_dir:
+                vector_index.load_or_build(self.db, self.index_dir)
+            else:
+                vector_index.index_all_nodes_from_graph(self.db)
+            with self._index_lock:
+                self._add_pending_nodes(vector_index)
+                self.vector_index = vector_index
+            logger.info("Vector index loaded.")
+        except ImportError:
+            logger.warning("NodeVectorIndex or its dependencies not found. Semantic search features disabled.")
+        except Exception as e:
+            logger.error(f"Failed to initialize vector index: {e}")
+        finally:
+            with self._index_lock:
+                self._pending_index = None
+            self._vector_ready.set()
+
+    def _add_pending_nodes(self, vector_index: NodeVectorIndex) -> None:
+        """Index the nodes written during the build that the graph snapshot missed.
+        
+        Must be called with _index_lock held, before vector_index is published.
+        
+        Args:
+            vector_index: The freshly built index
+        """
+        indexed_ids = {row["id"] for row in vector_index.metadata if row}
+        missing = list({
+            node.id: node for node in self._pending_index if node.id not in indexed_ids
+        }.values())
+        if not missing:
+            return
+
+        logger.info(f"Adding {len(missing)} nodes written during the vector index build.")
+        try:
+            vector_index.add_nodes_to_index(missing)
+            if self.index_dir:
+                vector_index.save(self.index_dir)
+        except Exception as e:
+            logger.error(f"Failed to add {len(missing)} nodes to vector index: {e}")
+
+    def wait_for_vector_index(self, timeout: Optional[float] = None) -> bool:
+        """Block until the background vector index build has finished.
+        
+        Args:
+            timeout: Maximum seconds to wait. If None, wait indefinitely.
+            
+        Returns:
+            True if the build finished (self.vector_index may still be None if it failed)
+        """
+        return self._vector_ready.wait(timeout)
+
+    def _write(self, query: str, params: Dict[str, Any], auto_commit: bool = False,
+               tx: Optional[Transaction] = None) -> List[Dict[str, Any]]:
+        """Run a write query on the manager's long-lived session.
+        
+        Writes from several threads are serialized, since a session must not be
+        used concurrently.
+        
+        Args:
+            query: Cypher query to execute
+            params: Parameters for the query
+            auto_commit: Run as an auto-commit query instead of a managed write
+                transaction (required for CALL { ... } IN TRANSACTIONS)
+            tx: Open explicit transaction to run the query in instead; the caller
+                commits or rolls it back
+            
+        Returns:
+            List of results as dictionaries
+            
+        Raises:
+            ValueError: If both auto_commit and tx are given
+        """
+        if tx is not None:
+            if auto_commit:
+                raise ValueError("CALL { ... } IN TRANSACTIONS cannot run inside an explicit transaction")
+            return self.db.run_query(query, params, session=tx)
+
+        with self._write_lock:
+            if self._write_session is None:
+                self._write_session = self.db.get_driver().session(default_access_mode=WRITE_ACCESS)
+
+            if auto_commit:
+                return self.db.run_query(query, params, session=self._write_session)
+            return self._write_session.execute_write(
+                lambda tx: [dict(record) for record in tx.run(query, params)]
+            )
+
+    def close(self) -> None:
+        """Close the manager's write session, if one was opened."""
+        with self._write_lock:
+            if self._write_session is not None:
+                self._write_session.close()
+                self._write_session = None
+
+    def _save_vector_index(self) -> None:
+        """Persist the vector index to index_dir, if one was configured."""
+        if self.vector_index and self.index_dir:
             try:
-                self.vector_index = NodeVectorIndex()
-                # Load existing nodes into vector index
-                logger.info("Initializing and loading vector index...")
-                self.vector_index.index_all_nodes_from_graph(self.db)
-                logger.info("Vector index loaded.")
-            except ImportError:
-                logger.warning("NodeVectorIndex or its dependencies not found. Semantic search features disabled.")
-                self.vector_index = None
+                self.vector_index.save(self.index_dir)
             except Exception as e:
-                logger.error(f"Failed to initialize vector index: {e}")
-                self.vector_index = None
+                logger.error(f"Failed to save vector index to {self.index_dir}: {e}")
 
     def parse_prompt(self, prompt: str) -> Tuple[List[NodeType], List[RelationType]]:
         """Parse a natural language prompt into nodes and relationships.
         
+        The nodes are added to the graph (without similarity checks), so
+        both the nodes and the relationships between them come back with IDs.
+        
+        Args:
+            prompt: Natural language description of nodes and relationships
+            
+        Returns:
+            Tuple of (nodes, relationships)
+        """
+        nodes, relationships = self._parse(prompt)
+
+        # Add all nodes to DB in one batch to get their IDs
+        self.add_nodes_bulk(nodes)
+
+        return nodes, relationships
+
+    def _parse(self, prompt: str) -> Tuple[List[NodeType], List[RelationType]]:
+        """Parse a prompt into nodes and relationships without writing anything.
+        
+        Relationships reference the returned node objects, so IDs assigned to
+        the nodes later are seen by the relationships too.
+        
         Args:
             prompt: Natural language description of nodes and relationships
             
@@ -59,71 +237,52 @@ class NodeManager:
         # Parse the text using the LLM
         parsed = self.parser.parse_text(prompt)
 
-        # Convert parsed nodes to appropriate Node subclass objects and add them to DB
+        # Convert parsed nodes to Node subclass objects, kept in parser order so
+        # relationships can refer to them by position
         nodes = []
-        node_map = {}  # Map of (type, name) -> node with ID
+        node_refs = {}  # Map of (type, name) -> position in nodes
         for node_data in parsed["nodes"]:
-            if node_data["type"] == "FailureMode":
-                node = FailureMode(
-                    name=node_data["name"],
-                    description=node_data.get("description")
-                )
-            elif node_data["type"] == "Observation":
-                node = Observation(
-                    name=node_data["name"],
-                    description=node_data.get("description")
-                )
-            elif node_data["type"] == "SensorReading":
-                node = SensorReading(
-                    name=node_data["name"],
-                    description=node_data.get("description"),
-                    unit=node_data.get("unit")
-                )
-            else:
-                raise ValueError(f"Unknown node type: {node_data['type']}")
-            
-            # Add node to DB to get its ID
-            node.id = self.add_node(node, force=True)
-            nodes.append(node)
-            node_map[(node.type, node.name)] = node
+            # The LLM often repeats a node; keep only its first occurrence so it is
+            # written and embedded once
+            key = (node_data.type, node_data.name)
+            if key in node_refs:
+                continue
+
+            node_class = NODE_CLASSES.get(node_data.type)
+            if node_class is None:
+                raise ValueError(f"Unknown node type: {node_data.type}")
+
+            node_refs[key] = len(nodes)
+            nodes.append(node_class(**node_data.model_dump(exclude={"id", "type"})))
 
         # Convert parsed relationships to appropriate Relationship subclass objects
         relationships = []
         for rel_data in parsed["relationships"]:
-            # Get source and destination nodes (they should already exist with IDs)
-            source_type = rel_data["source"]["type"]
-            source_name = rel_data["source"]["name"]
-            dest_type = rel_data["destination"]["type"]
-            dest_name = rel_data["destination"]["name"]
-
-            source = node_map.get((source_type, source_name))
-            dest = node_map.get((dest_type, dest_name))
+            source_key = (rel_data.source.type, rel_data.source.name)
+            target_key = (rel_data.target.type, rel_data.target.name)
+            source_ref = node_refs.get(source_key)
+            target_ref = node_refs.get(target_key)
 
-            if not source or not dest:
-                logger.warning(f"Missing nodes for relationship: {source_type}:{source_name} -> {dest_type}:{dest_name}")
+            if source_ref is None or target_ref is None:
+                logger.warning(f"Missing nodes for relationship: {source_key[0]}:{source_key[1]} -> {target_key[0]}:{target_key[1]}")
                 continue
 
+            source = nodes[source_ref]
+            target = nodes[target_ref]
+
             # Create relationship
-            if rel_data["type"] == "CausesLink":
-                rel = CausesLink(
-                    source=source,
-                    dest=dest
-                )
-            else:  # EvidenceLink
-                props = rel_data.get("properties", {})
-                
+            if rel_data.type == "CAUSES":
+                rel = CausesLink(source=source, target=target)
+            else:  # EVIDENCE_FOR
+                props = getattr(rel_data, "properties", None) or EvidenceProperties()
+
                 # Default strengths if not provided in properties
-                when_true = props.get("when_true_strength", "suggests")
-                when_false = props.get("when_false_strength", "inconclusive")
-                
-                rel = EvidenceLink(
-                    source=source,
-                    dest=dest,
-                    when_true_strength=EvidenceStrength(when_true),
-                    when_false_strength=EvidenceStrength(when_false),
-                    operator=ComparisonOperator(props.get("operator")) if props.get("operator") else None,
-                    threshold=props.get("threshold")
-                )
+                if props.when_true_strength is None:
+                    props.when_true_strength = EvidenceStrength.SUGGESTS.value
+                if props.when_false_strength is None:
+                    props.when_false_strength = EvidenceStrength.INCONCLUSIVE.value
+
+                rel = EvidenceLink(source=source, target=target, properties=props)
 
             relationships.append(rel)
 
@@ -144,75 +303,90 @@ class NodeManager:
             search_text += f". {node.description}"
 
         # Check if vector index is available
+        if not self._vector_ready.is_set():
+            logger.info("Vector index still building. Skipping similarity search.")
+            return []
         if not self.vector_index:
             logger.warning("Vector index not initialized. Skipping similarity search.")
             return []
 
-        # Search vector index
-        return self.vector_index.search(search_text)
+        # Search vector index, reusing results for text already searched
+        return list(self._search_cache(search_text))
 
-    def add_node(self, node: NodeType, force: bool = False) -> str:
+    def _search_index(self, search_text: str) -> Tuple[SearchResult, ...]:
+        """Search the vector index (uncached; use _search_cache).
+        
+        Args:
+            search_text: Canonical node text to search for
+            
+        Returns:
+            Tuple of search results
+        """
+        return tuple(self.vector_index.search(search_text))
+
+    def check_similar(self, node: NodeType) -> None:
+        """Check that no existing node is similar to the given one.
+
+        Args:
+            node: Node about to be added
+
+        Raises:
+            SimilarNodeError: If a node scoring at or above similarity_threshold exists
+        """
+        if not self.vector_index:
+            return
+        similar = self.find_similar_nodes(node)
+        if similar and similar[0].score >= self.similarity_threshold:
+            raise SimilarNodeError(similar[0].id, similar[0].name, similar[0].score)
+
+    def add_node(self, node: NodeType, force: bool = False, tx: Optional[Transaction] = None) -> str:
         """Add a new node to the graph if no similar nodes exist.
         
         Args:
             node: Node to add
             force: Whether to add even if similar nodes exist
+            tx: Open transaction to write in. If None, the write commits on its own.
+                If given, the node is not added to the vector index; call
+                index_nodes once the transaction has committed.
             
         Returns:
             Neo4j node ID of new or existing node
             
         Raises:
-            ValueError: If similar nodes exist and force=False
+            SimilarNodeError: If similar nodes exist and force=False
         """
-        if not force and self.vector_index:
-            similar = self.find_similar_nodes(node)
-            if similar and similar[0].score >= self.similarity_threshold:
-                raise ValueError(
-                    f"Similar node exists: {similar[0].name} "
-                    f"(similarity: {similar[0].score:.2f})"
-                )
-
-        # Create or merge node in Neo4j
+        if not force:
+            self.check_similar(node)
+
+        # Create or merge node in Neo4j; one query shape per label keeps the plan cached
+        props = {"description": node.description}
+        if isinstance(node, SensorReading) and node.unit:
+            props["unit"] = node.unit
+
         query = f"""
         MERGE (n:{node.type} {{name: $name}})
-        SET n.description = $description
+        SET n += $props
+        RETURN elementId(n) as node_id
         """
-        params = {
-            "name": node.name,
-            "description": node.description
-        }
-        
-        if isinstance(node, SensorReading) and node.unit:
-            query = query.replace(
-                "SET n.description = $description",
-                "SET n.description = $description, n.unit = $unit"
-            )
-            params["unit"] = node.unit
 
-        # Add RETURN after the SET
-        query += "\nRETURN elementId(n) as node_id"
-
-        result = self.db.run_query(query, params)
+        result = self._write(query, {"name": node.name, "props": props}, tx=tx)
         node_id = result[0]["node_id"]
 
         # Update node with Neo4j ID
         node.id = node_id
 
-        # Add to vector index only if it exists
-        if self.vector_index:
-            try:
-                self.vector_index.add_node_to_index(node)
-            except Exception as e:
-                logger.error(f"Failed to add node {node.name} to vector index: {e}")
-                # Continue even if adding to index fails, as node is in DB
+        # An uncommitted node may still be rolled back, so the caller indexes it after commit
+        if tx is None:
+            self.index_nodes([node])
 
         return node_id
 
-    def add_relationship(self, rel: RelationType) -> str:
+    def add_relationship(self, rel: RelationType, tx: Optional[Transaction] = None) -> str:
         """Add a new relationship between nodes.
         
         Args:
             rel: Relationship to add
+            tx: Open transaction to write in. If None, the write commits on its own.
             
         Returns:
             Neo4j relationship ID
@@ -220,91 +394,180 @@ class NodeManager:
         if not rel.has_valid_ids(): # Check if source/target nodes have IDs
             raise ValueError(f"Cannot add relationship, source or target node missing ID: {rel}")
 
-        # Get source/target IDs using the correct field name
-        source_id = rel.source.id
-        target_id = rel.target.id # Use target.id
-        rel_type_str = rel.type # Use the type attribute directly (e.g., "CAUSES", "EVIDENCE_FOR")
-
-        # Create relationship
-        if isinstance(rel, CausesLink):
-            query = f"""
-            MATCH (source), (target)
-            WHERE elementId(source) = $source_id
-              AND elementId(target) = $target_id
-            MERGE (source)-[r:{rel_type_str}]->(target)
-            RETURN elementId(r) as rel_id
-            """
-            params = {
-                "source_id": source_id,
-                "target_id": target_id
-            }
-        elif isinstance(rel, EvidenceLink): # Use elif for clarity
-            # Build the property dictionary from the nested 'properties' field
-            rel_props = {}
-            if rel.properties: # Check if properties exist
-                # Add strengths
-                if rel.properties.when_true_strength:
-                    rel_props["when_true_strength"] = rel.properties.when_true_strength.value
-                if rel.properties.when_false_strength:
-                    rel_props["when_false_strength"] = rel.properties.when_false_strength.value
-                
-                # Add rationales
-                if rel.properties.when_true_rationale:
-                    rel_props["when_true_rationale"] = rel.properties.when_true_rationale
-                if rel.properties.when_false_rationale:
-                    rel_props["when_false_rationale"] = rel.properties.when_false_rationale
-
-                # Add operator
-                if rel.properties.operator:
-                    rel_props["operator"] = rel.properties.operator.value
-                
-                # Add threshold
-                if rel.properties.threshold is not None:
-                    rel_props["threshold"] = rel.properties.threshold
-                
-            # Note: 'name' was removed from EvidenceProperties, assuming it's not set here.
+        if not isinstance(rel, (CausesLink, EvidenceLink)):
+            raise TypeError(f"Unsupported relationship type: {type(rel)}")
+
+        # Each relationship class builds its own query and parameters
+        query, params = rel.to_cypher_params(rel.source.id, rel.target.id)
+
+        result = self._write(query, params, tx=tx)
+        
+        # MERGE always returns a row once both endpoints matched; no row means an id was stale
+        if not result:
+            raise ConnectionError(f"Failed to create or find relationship after merge: {rel}")
+
+        rel_id = result[0]["rel_id"]
+        rel.id = rel_id
+        return rel_id
+
+    def _bulk_query(self, body: str, inner_return: str, outer_return: str) -> str:
+        """Wrap a per-row write in an UNWIND over $rows.
+        
+        Args:
+            body: Cypher executed for each `row`
+            inner_return: Values produced by body for each row (e.g. "elementId(n) AS node_id")
+            outer_return: Final RETURN items, which may use `row` and the inner_return names
             
-            # Create the Cypher query with property mapping
-            query = f"""
-            MATCH (source), (target)
-            WHERE elementId(source) = $source_id
-              AND elementId(target) = $target_id
-            MERGE (source)-[r:{rel_type_str}]->(target)
-            SET r = $properties
-            RETURN elementId(r) as rel_id
+        Returns:
+            The complete Cypher query
+        """
+        if self.concurrent_writes:
+            return f"""
+            UNWIND $rows AS row
+            CALL {{
+                WITH row
+                {body}
+                RETURN {inner_return}
+            }} IN CONCURRENT TRANSACTIONS OF {BULK_BATCH_SIZE} ROWS
+            RETURN {outer_return}
+            """
+        return f"""
+            UNWIND $rows AS row
+            {body}
+            WITH row, {inner_return}
+            RETURN {outer_return}
             """
+
+    def add_nodes_bulk(self, nodes: List[NodeType], tx: Optional[Transaction] = None,
+                       embeddings: Optional[np.ndarray] = None) -> Dict[Tuple[str, str], str]:
+        """Add many nodes at once, with one UNWIND MERGE per node type.
+        
+        No similarity check is performed (equivalent to add_node with force=True).
+        Each node's id is updated in place.
+        
+        Args:
+            nodes: Nodes to add
+            tx: Open transaction to write in. If None, each write commits on its
+                own. Not supported together with concurrent_writes. If given, the
+                nodes are not added to the vector index; call index_nodes once the
+                transaction has committed.
+            embeddings: Vector index embeddings of nodes, one row per node, to
+                index instead of re-embedding them
             
-            params = {
-                "source_id": source_id,
-                "target_id": target_id,
-                "properties": rel_props
-            }
-        else:
-             # Handle cases where rel is not CausesLink or EvidenceLink if necessary
-            raise TypeError(f"Unsupported relationship type: {type(rel)}")
+        Returns:
+            Map of (type, name) -> Neo4j node ID
+        """
+        # Bucket rows by label so each label is a single round-trip
+        buckets: Dict[str, List[Dict[str, Any]]] = {}
+        for node in nodes:
+            props = {"description": node.description}
+            if isinstance(node, SensorReading) and node.unit:
+                props["unit"] = node.unit
+            buckets.setdefault(node.type, []).append({"name": node.name, "props": props})
+
+        node_ids: Dict[Tuple[str, str], str] = {}
+        for node_type, rows in buckets.items():
+            query = self._bulk_query(
+                f"MERGE (n:{node_type} {{name: row.name}}) SET n += row.props",
+                "elementId(n) AS node_id",
+                "row.name AS name, node_id"
+            )
+            for record in self._write(query, {"rows": rows}, auto_commit=self.concurrent_writes, tx=tx):
+                node_ids[(node_type, record["name"])] = record["node_id"]
+
+        for node in nodes:
+            node.id = node_ids[(node.type, node.name)]
+
+        # An uncommitted node may still be rolled back, so the caller indexes it after commit
+        if tx is None:
+            self.index_nodes(nodes, embeddings)
 
-        result = self.db.run_query(query, params)
+        return node_ids
+
+    def index_nodes(self, nodes: List[NodeType], embeddings: Optional[np.ndarray] = None) -> None:
+        """Add written nodes to the vector index, if it exists, and persist it.
         
-        # Handle potential case where MERGE didn't return a result (shouldn't happen with MATCH)
-        if not result or not result[0].get("rel_id"):
-            logger.error(f"Failed to create/merge relationship or retrieve ID: {rel}")
-            # Attempt to find the relationship if merge failed to return ID
-            find_query = f"""
-            MATCH (source)-[r:{rel_type_str}]->(target)
-            WHERE elementId(source) = $source_id AND elementId(target) = $target_id
-            RETURN elementId(r) as rel_id LIMIT 1
-            """
-            find_result = self.db.run_query(find_query, {"source_id": source_id, "target_id": target_id})
-            if find_result and find_result[0].get("rel_id"):
-                 rel_id = find_result[0]["rel_id"]
-                 logger.warning(f"Retrieved existing relationship ID after MERGE failed to return one: {rel_id}")
-            else:
-                raise ConnectionError(f"Failed to create or find relationship after merge: {rel}") # Or handle differently
-        else:
-            rel_id = result[0]["rel_id"]
+        add_node and add_nodes_bulk do this themselves unless given a transaction;
+        in that case call this after the transaction commits. Nodes given while the
+        index is still being built are added once the build finishes.
+        
+        Args:
+            nodes: Nodes with Neo4j IDs set
+            embeddings: Embeddings of nodes from vector_index.embed_nodes, one row
+                per node. If None, the nodes are embedded here.
+        """
+        if not nodes:
+            return
+
+        with self._index_lock:
+            if self.vector_index is None:
+                # The build's graph snapshot may predate these nodes
+                if self._pending_index is not None:
+                    self._pending_index.extend(nodes)
+                return
+
+            # Embed all nodes in one batch
+            try:
+                self.vector_index.add_nodes_to_index(nodes, embeddings=embeddings)
+            except Exception as e:
+                logger.error(f"Failed to add {len(nodes)} nodes to vector index: {e}")
+                # Continue even if adding to index fails, as the nodes are in the DB
+            self._search_cache.cache_clear()
+            self._save_vector_index()
+
+    def add_relationships_bulk(self, rels: List[RelationType], tx: Optional[Transaction] = None,
+                               skip_unmatched: bool = False) -> List[Optional[str]]:
+        """Add many relationships at once, with one UNWIND MERGE per relationship type.
+        
+        Each relationship's id is updated in place.
+        
+        Args:
+            rels: Relationships to add; their source and target nodes must have IDs
+            tx: Open transaction to write in. If None, each write commits on its
+                own. Not supported together with concurrent_writes.
+            skip_unmatched: Leave out relationships whose source or target ID matches
+                no node, returning None for them, instead of raising
             
-        rel.id = rel_id
-        return rel_id
+        Returns:
+            Neo4j relationship IDs, in the same order as rels
+            
+        Raises:
+            ConnectionError: If an endpoint ID matches no node and skip_unmatched=False
+        """
+        buckets: Dict[str, List[Dict[str, Any]]] = {}
+        for index, rel in enumerate(rels):
+            if not rel.has_valid_ids():
+                raise ValueError(f"Cannot add relationship, source or target node missing ID: {rel}")
+            if not isinstance(rel, (CausesLink, EvidenceLink)):
+                raise TypeError(f"Unsupported relationship type: {type(rel)}")
+            buckets.setdefault(rel.type, []).append({
+                "index": index,
+                "source_id": rel.get_source_id(),
+                "target_id": rel.get_dest_id(),
+                "properties": rel.cypher_properties()
+            })
+
+        rel_ids: List[Optional[str]] = [None] * len(rels)
+        for rel_type_str, rows in buckets.items():
+            set_clause = " SET r = row.properties" if rel_type_str == "EVIDENCE_FOR" else ""
+            query = self._bulk_query(
+                "MATCH (source) WHERE elementId(source) = row.source_id "
+                "MATCH (target) WHERE elementId(target) = row.target_id "
+                f"MERGE (source)-[r:{rel_type_str}]->(target){set_clause}",
+                "elementId(r) AS rel_id",
+                "row.index AS index, rel_id"
+            )
+            for record in self._write(query, {"rows": rows}, auto_commit=self.concurrent_writes, tx=tx):
+                rel_ids[record["index"]] = record["rel_id"]
+
+        for rel, rel_id in zip(rels, rel_ids):
+            if rel_id is None:
+                if skip_unmatched:
+                    continue
+                raise ConnectionError(f"Failed to create or find relationship after merge: {rel}")
+            rel.id = rel_id
+
+        return rel_ids
 
     def process_natural_language(self, prompt: str, interactive: bool = True) -> None:
         """Process a natural language prompt to add nodes and relationships.
@@ -313,31 +576,43 @@ class NodeManager:
             prompt: Natural language description
             interactive: Whether to ask user about similar nodes
         """
-        # Parse the prompt
-        nodes, relationships = self.parse_prompt(prompt)
-
-        # Process each node
-        for node in nodes:
-            try:
-                self.add_node(node, force=not interactive)
-            except ValueError as e:
-                if interactive:
-                    # Show similar nodes and ask user what to do
-                    similar = self.find_similar_nodes(node)
-                    print(f"\nFound similar node for: {node.name}")
-                    for i, s in enumerate(similar[:5], 1):
-                        print(f"{i}. {s.name} (similarity: {s.score:.2f})")
-                    print("0. Create new node anyway")
-                    
-                    choice = input("Choose an option (0-5): ")
-                    if choice == "0":
-                        self.add_node(node, force=True)
-                    else:
-                        # Use the existing node's ID
-                        node.id = similar[int(choice)-1].id
+        # Parse the prompt; nothing is written until all decisions are made
+        nodes, relationships = self._parse(prompt)
+
+        if interactive:
+            # Phase 1: look up similar nodes for every node up front, in parallel
+            # (embedding and FAISS search release the GIL)
+            with ThreadPoolExecutor() as executor:
+                similar_by_node = list(executor.map(self.find_similar_nodes, nodes))
+
+            # Phase 2: ask about each node that has a close match
+            new_nodes = []
+            for node, similar in zip(nodes, similar_by_node):
+                if not similar or similar[0].score < self.similarity_threshold:
+                    new_nodes.append(node)
+                    continue
+
+                print(f"\nFound similar node for: {node.name}")
+                for i, s in enumerate(similar[:5], 1):
+                    print(f"{i}. {s.name} (similarity: {s.score:.2f})")
+                print("0. Create new node anyway")
+
+                choice = input("Choose an option (0-5): ")
+                if choice == "0":
+                    new_nodes.append(node)
                 else:
-                    raise
+                    # Use the existing node's ID
+                    node.id = similar[int(choice)-1].id
+        else:
+            new_nodes = nodes
 
-        # Process relationships
-        for rel in relationships:
-            self.add_relationship(rel) 
\ No newline at end of file
+        # Phase 3: write every node that wasn't mapped to an existing one in one batch
+        self.add_nodes_bulk(new_nodes)
+
+        # Process relationships, dropping duplicates (same type and endpoints)
+        # so MERGE isn't asked to dedupe them one round-trip at a time
+        unique_relationships = {
+            (rel.type, rel.get_source_id(), rel.get_dest_id()): rel
+            for rel in relationships
+        }
+        self.add_relationships_bulk(list(unique_relationships.values())) 
\ No newline at end of file
@@ -1 +1,7 @@
-"""Prompts module for templating LLM prompts.""" 
\ No newline at end of file
+"""Prompts module for templating LLM prompts."""
+
+from jinja2 import Environment
+
+# Shared environment for all prompt templates. Templates are compiled once at
+# import via env.from_string and never reloaded.
+env = Environment(trim_blocks=True, lstrip_blocks=True, auto_reload=False)
@@ -1,6 +1,14 @@
 """Evidence strength assessment prompt for the LLM parser chain."""
 
-from jinja2 import Template
+import json
+from functools import lru_cache
+
+try:
+    import orjson
+except ImportError:  # optional speedup; fall back to the standard library
+    orjson = None
+
+from . import env
 
 SYSTEM_PROMPT = """You are a detailed parser specializing in assessing the strength of evidence for diagnostic relationships based on provided text and context.
 Your task is to take a list of previously identified relationships (both CAUSES and EVIDENCE_FOR) and enrich the EVIDENCE_FOR relationships with evidence strength assessments.
@@ -11,7 +19,7 @@ Your task is to take a list of previously identified relationships (both CAUSES
 - Ensure your output is valid JSON adhering strictly to the specified format.
 """
 
-USER_PROMPT_TEMPLATE = Template("""Given the following context (original text and previously identified relationships), analyze each relationship.
+USER_PROMPT_TEMPLATE = env.from_string("""Given the following context (original text and previously identified relationships), analyze each relationship.
 
 Context:
 Text: {{ input_text }}
@@ -116,9 +124,17 @@ def get_evidence_prompt(input_text: str, initial_relationships: str) -> str:
     """
     # Ensure initial_relationships is a string (it should be passed as JSON)
     if not isinstance(initial_relationships, str):
-        import json
-        initial_relationships = json.dumps(initial_relationships, indent=2)
+        if orjson is not None:
+            initial_relationships = orjson.dumps(initial_relationships, option=orjson.OPT_INDENT_2).decode()
+        else:
+            initial_relationships = json.dumps(initial_relationships, indent=2)
+
+    return _render_evidence_prompt(input_text, initial_relationships)
+
 
+@lru_cache(maxsize=128)
+def _render_evidence_prompt(input_text: str, initial_relationships: str) -> str:
+    """Render the evidence prompt; cached since both inputs are strings."""
     return USER_PROMPT_TEMPLATE.render(
         input_text=input_text,
         initial_relationships=initial_relationships
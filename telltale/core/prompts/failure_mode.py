@@ -1,10 +1,12 @@
 """Failure mode identification prompt for the LLM parser chain."""
 
-from jinja2 import Template
+from functools import lru_cache
+
+from . import env
 
 SYSTEM_PROMPT = """You are a parser that identifies implied failure modes from natural language descriptions. Your output must be in JSON format."""
 
-USER_PROMPT_TEMPLATE = Template("""Given the following text and identified nodes, identify any implied failure modes.
+USER_PROMPT_TEMPLATE = env.from_string("""Given the following text and identified nodes, identify any implied failure modes.
 
 Text: {{ input_text }}
 
@@ -44,6 +46,7 @@ Example format:
   ]
 }""")
 
+@lru_cache(maxsize=128)
 def get_failure_mode_prompt(input_text: str, identified_nodes: str) -> str:
     """Render the failure mode identification prompt with the given input text and nodes.
     
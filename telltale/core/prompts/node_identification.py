@@ -1,10 +1,12 @@
 """Node identification prompt for the LLM parser chain."""
 
-from jinja2 import Template
+from functools import lru_cache
+
+from . import env
 
 SYSTEM_PROMPT = """You are a parser that identifies diagnostic elements from natural language descriptions. Your output must be in JSON format."""
 
-USER_PROMPT_TEMPLATE = Template("""Given the following text, identify all diagnostic nodes following our strict schema.
+USER_PROMPT_TEMPLATE = env.from_string("""Given the following text, identify all diagnostic nodes following our strict schema.
 
 Text: {{ input_text }}
 
@@ -92,6 +94,7 @@ Example format:
   ]
 }""")
 
+@lru_cache(maxsize=128)
 def get_node_prompt(input_text: str) -> str:
     """Render the node identification prompt with the given input text.
     
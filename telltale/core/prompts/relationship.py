@@ -1,6 +1,6 @@
 """Relationship formation prompt for the LLM parser chain."""
 
-from jinja2 import Template
+from functools import lru_cache
 
 SYSTEM_PROMPT = """You are a parser that identifies relationships between nodes in a diagnostic system. Your output must be in JSON format.
 
@@ -91,7 +91,7 @@ Output Format:
   ]
 }"""
 
-USER_PROMPT_TEMPLATE = Template("""Given the following text and nodes, identify relationships between them following our strict schema.
+USER_PROMPT_TEMPLATE = """Given the following text and nodes, identify relationships between them following our strict schema.
 
 Text: {{ input_text }}
 
@@ -184,8 +184,15 @@ Example format:
       }
     }
   ]
-}""")
+}"""
+
+# The template only substitutes two values, so split it once at the placeholders
+# and render by joining the static fragments around them
+_PREFIX, _rest = USER_PROMPT_TEMPLATE.split("{{ input_text }}")
+_MIDDLE, _SUFFIX = _rest.split("{{ identified_nodes }}")
 
+# Keyed on all three inputs; input_nodes/identified_nodes repeat across a parse batch
+@lru_cache(maxsize=256)
 def get_relationship_prompt(input_text: str, identified_nodes: str, input_nodes: str) -> str:
     """Render the relationship formation prompt with the given inputs.
     
@@ -197,8 +204,4 @@ def get_relationship_prompt(input_text: str, identified_nodes: str, input_nodes:
     Returns:
         The rendered prompt
     """
-    return USER_PROMPT_TEMPLATE.render(
-        input_text=input_text,
-        identified_nodes=identified_nodes,
-        input_nodes=input_nodes
-    ) 
\ No newline at end of file
+    return "".join((_PREFIX, input_text, _MIDDLE, identified_nodes, _SUFFIX))
@@ -1,19 +1,74 @@
 """Semantic search functionality for finding similar nodes in the knowledge graph."""
 
+import hashlib
 import json
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Union, Any
+from typing import Dict, List, Optional, Tuple, Union, Any
 
 import faiss
 import numpy as np
+
+try:
+    import orjson
+except ImportError:  # optional speedup; fall back to the standard library
+    orjson = None
+import torch
 from sentence_transformers import SentenceTransformer
-from pydantic import BaseModel
 
 from .models import Node, FailureMode, Observation, SensorReading
 from .database import Neo4jConnection
 
+# Node labels pulled from the graph into the index
+INDEXED_NODE_TYPES = [FailureMode.__name__, Observation.__name__, SensorReading.__name__]
+
+# Coarse cells of the 'ivfpq' index type, and the vectors needed to train it:
+# FAISS wants about 39 training points per centroid, and each PQ codebook has
+# 256 centroids (more than the coarse cells)
+IVFPQ_NLIST = 64
+IVFPQ_TRAINING_SIZE = 39 * 256
+
+# Leading bytes of the type code FAISS writes at the start of IVF index files
+IVF_FOURCC_PREFIXES = (b"Iw", b"Iv")
+
+# Loaded encoders shared by every NodeVectorIndex, keyed on (model name, backend)
+_MODEL_CACHE: Dict[Tuple[str, str], SentenceTransformer] = {}
+
+
+def _load_model(model_name: str, backend: str) -> SentenceTransformer:
+    """Load a sentence encoder, reusing an already loaded copy when there is one.
+    
+    Args:
+        model_name: Name of the sentence-transformers model
+        backend: Inference backend ('torch' or 'onnx')
+        
+    Returns:
+        The shared SentenceTransformer instance
+    """
+    key = (model_name, backend)
+    if key in _MODEL_CACHE:
+        return _MODEL_CACHE[key]
+
+    if backend == "onnx":
+        # Same pooling and normalization as the torch model, so embeddings stay
+        # compatible with indexes built by either backend
+        model = SentenceTransformer(model_name, device="cpu", backend="onnx")
+    elif backend == "torch":
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        model = SentenceTransformer(model_name, device=device)
+        if device == "cuda":
+            # fp16 inference; _embed_texts casts the output back to float32 for FAISS
+            model.half()
+    else:
+        raise ValueError("backend must be 'torch' or 'onnx'")
 
-class SearchResult(BaseModel):
+    _MODEL_CACHE[key] = model
+    return model
+
+
+@dataclass(frozen=True, slots=True)
+class SearchResult:
     """Result from a semantic search query."""
     id: str
     name: str
@@ -30,25 +85,109 @@ class NodeVectorIndex:
         model_name: str = "all-MiniLM-L6-v2",
         dimension: int = 384,  # Default dimension for all-MiniLM-L6-v2
         index_type: str = "l2",
+        backend: str = "torch",
     ):
         """Initialize the vector index.
         
         Args:
             model_name: Name of the sentence-transformers model to use
             dimension: Embedding dimension (must match model output)
-            index_type: Type of FAISS index ('l2' or 'cosine')
+            index_type: Type of FAISS index ('l2', 'cosine', 'hnsw' for approximate
+                L2 search, 'ivfpq' for product-quantized inverted lists (exact L2
+                until IVFPQ_TRAINING_SIZE vectors are added), or 'sq8' for L2 over
+                int8-quantized vectors)
+            backend: Encoder inference backend ('torch', or 'onnx' to run the model
+                on CPU through ONNX Runtime, which is faster on hosts without a GPU)
         """
-        self.model = SentenceTransformer(model_name)
+        self.model = _load_model(model_name, backend)
+        # Query embeddings by query text, stored as bytes since arrays aren't hashable
+        self._query_embedding_cache = lru_cache(maxsize=1024)(self._embed_query_bytes)
+        # 'ivfpq' index waiting for enough vectors to be trained (see _add_embeddings)
+        self._untrained_ivfpq: Optional[faiss.IndexIVFPQ] = None
+        # Set by load(mmap=True) when the index's inverted lists are mapped read-only
+        self._read_only = False
         
         if index_type == "l2":
             self.index = faiss.IndexFlatL2(dimension)
         elif index_type == "cosine":
             self.index = faiss.IndexFlatIP(dimension)
+        elif index_type == "hnsw":
+            # Approximate L2 search over an HNSW graph (32 links per vector)
+            self.index = faiss.IndexHNSWFlat(dimension, 32)
+            self.index.hnsw.efConstruction = 64
+        elif index_type == "ivfpq":
+            # Inverted lists over IVFPQ_NLIST coarse cells, each vector stored as 48
+            # one-byte PQ codes. Until IVFPQ_TRAINING_SIZE vectors have been added
+            # they are searched exactly in a flat L2 index, then moved into this one
+            quantizer = faiss.IndexFlatL2(dimension)
+            self._untrained_ivfpq = faiss.IndexIVFPQ(quantizer, dimension, IVFPQ_NLIST, 48, 8)
+            self._untrained_ivfpq.nprobe = 8
+            # Keep id -> vector lookups (and removal) available; IVF indexes track
+            # ids themselves so this one is never wrapped in an IndexIDMap2
+            self._untrained_ivfpq.set_direct_map_type(faiss.DirectMap.Hashtable)
+            self.index = faiss.IndexFlatL2(dimension)
+        elif index_type == "sq8":
+            # L2 search over vectors stored as 8-bit codes (1 byte per component instead of 4)
+            self.index = faiss.IndexScalarQuantizer(
+                dimension, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_L2
+            )
+            # The encoder emits unit-length vectors, so every component lies in [-1, 1];
+            # train the quantizer on that fixed range rather than on the first batch of data
+            bounds = np.stack([np.full(dimension, -1.0), np.full(dimension, 1.0)]).astype('float32')
+            self.index.train(bounds)
         else:
-            raise ValueError("index_type must be 'l2' or 'cosine'")
+            raise ValueError("index_type must be 'l2', 'cosine', 'hnsw', 'ivfpq' or 'sq8'")
+
+        # Address vectors by explicit int64 ids so they can be removed without a rebuild
+        if not isinstance(self.index, faiss.IndexIVF):
+            self.index = faiss.IndexIDMap2(self.index)
             
-        # Map FAISS index positions to node metadata
-        self.metadata: List[Dict[str, Any]] = []
+        # Node metadata stored as parallel columns; a vector's FAISS id is its
+        # position in the columns (removed nodes leave None entries)
+        self._clear_metadata()
+
+    def _clear_metadata(self) -> None:
+        """Reset the metadata columns."""
+        self._ids: List[str] = []
+        self._names: List[str] = []
+        self._types: List[str] = []
+        self._descriptions: List[Optional[str]] = []
+        self._content_hashes: List[Optional[str]] = []
+
+    def _append_metadata(self, nodes: List[Node], content_hashes: List[str]) -> None:
+        """Append metadata for nodes just added to the FAISS index.
+        
+        Args:
+            nodes: Nodes in the order their vectors were added
+            content_hashes: Content hash of each node's canonical text
+        """
+        self._ids.extend(node.id for node in nodes)
+        self._names.extend(node.name for node in nodes)
+        self._types.extend(node.type for node in nodes)
+        self._descriptions.extend(node.description for node in nodes)
+        self._content_hashes.extend(content_hashes)
+
+    @property
+    def metadata(self) -> List[Optional[Dict[str, Any]]]:
+        """Node metadata as one dict per FAISS id (None where a node was removed)."""
+        return [
+            {"id": node_id, "name": name, "type": node_type, "description": description, "content_hash": content_hash}
+            if node_id is not None else None
+            for node_id, name, node_type, description, content_hash in zip(
+                self._ids, self._names, self._types, self._descriptions, self._content_hashes
+            )
+        ]
+
+    @metadata.setter
+    def metadata(self, rows: List[Optional[Dict[str, Any]]]) -> None:
+        self._clear_metadata()
+        for row in rows:
+            row = row or {}
+            self._ids.append(row.get("id"))
+            self._names.append(row.get("name"))
+            self._types.append(row.get("type"))
+            self._descriptions.append(row.get("description"))
+            self._content_hashes.append(row.get("content_hash"))
         
     def _generate_text(self, node: Node) -> str:
         """Generate canonical text representation of a node.
@@ -59,11 +198,60 @@ class NodeVectorIndex:
         Returns:
             String representation combining type, name, and description
         """
-        text = f"{node.type}: {node.name}"
         if node.description:
-            text += f". {node.description}"
-        return text
+            return f"{node.type}: {node.name}. {node.description}"
+        return f"{node.type}: {node.name}"
+
+    def _content_hash(self, text: str) -> str:
+        """Hash a node's canonical text so changed nodes can be detected.
         
+        Args:
+            text: Canonical node text from _generate_text
+            
+        Returns:
+            Hex digest of the text
+        """
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+        
+    def _embed_texts(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        """Generate unit-length embeddings for several texts in batches.
+        
+        Vectors are L2-normalized once here, so inner product equals cosine
+        similarity and no norms need computing at search time.
+        
+        When there is more than one batch, texts are grouped by token count so
+        each batch pads to a similar length, then results are put back in order.
+        
+        Args:
+            texts: Texts to embed
+            batch_size: Number of texts to encode per model forward pass
+            
+        Returns:
+            Contiguous float32 array of shape (len(texts), dimension)
+        """
+        if len(texts) <= batch_size:
+            embeddings = self.model.encode(
+                texts,
+                batch_size=len(texts),
+                convert_to_numpy=True,
+                show_progress_bar=False
+            )
+            embeddings = np.ascontiguousarray(embeddings, dtype='float32')
+        else:
+            token_ids = self.model.tokenizer(texts, add_special_tokens=False)["input_ids"]
+            order = np.argsort([len(ids) for ids in token_ids], kind="stable")
+            embeddings = np.empty((len(texts), self.index.d), dtype='float32')
+            for start in range(0, len(texts), batch_size):
+                rows = order[start:start + batch_size]
+                embeddings[rows] = self.model.encode(
+                    [texts[row] for row in rows],
+                    batch_size=len(rows),
+                    convert_to_numpy=True,
+                    show_progress_bar=False
+                )
+        faiss.normalize_L2(embeddings)
+        return embeddings
+
     def _embed_text(self, text: str) -> np.ndarray:
         """Generate embedding for text using the model.
         
@@ -73,47 +261,149 @@ class NodeVectorIndex:
         Returns:
             Numpy array of embeddings
         """
-        return self.model.encode([text])[0]
+        return self._embed_texts([text])[0]
+        
+    def _embed_query_bytes(self, text: str) -> bytes:
+        """Embed a query and return the raw float32 bytes for caching.
+        
+        Args:
+            text: Query text to embed
+            
+        Returns:
+            Bytes of the unit-length float32 embedding
+        """
+        return self._embed_text(text).tobytes()
+        
+    def _base_index(self) -> faiss.Index:
+        """Return the underlying FAISS index, unwrapped from its IndexIDMap2."""
+        if isinstance(self.index, faiss.IndexIDMap):
+            return faiss.downcast_index(self.index.index)
+        return self.index
+
+    def _check_writable(self) -> None:
+        """Raise if the index was memory-mapped read-only by load(mmap=True).
+        
+        Raises:
+            ValueError: If the index cannot be modified
+        """
+        if self._read_only:
+            raise ValueError("Index was memory-mapped read-only; load it with mmap=False to modify it")
+
+    def _add_embeddings(self, embeddings: np.ndarray) -> None:
+        """Add embeddings to the FAISS index, training it first if needed.
         
+        Must be called before the matching _append_metadata, since each
+        vector's id is the position its metadata will take.
+        
+        Args:
+            embeddings: float32 array of shape (n, dimension)
+        """
+        self._check_writable()
+        if not self.index.is_trained:
+            self.index.train(embeddings)
+
+        if isinstance(self.index, (faiss.IndexIDMap, faiss.IndexIVF)):
+            start = len(self._ids)
+            ids = np.arange(start, start + len(embeddings), dtype='int64')
+            self.index.add_with_ids(embeddings, ids)
+        else:
+            # Indexes saved without an id map number vectors by position
+            self.index.add(embeddings)
+
+        if self._untrained_ivfpq is not None and self.index.ntotal >= IVFPQ_TRAINING_SIZE:
+            self._train_ivfpq()
+
+    def _train_ivfpq(self) -> None:
+        """Train the pending 'ivfpq' index on the staged vectors and move them into it."""
+        ivfpq = self._untrained_ivfpq
+        ids = faiss.vector_to_array(self.index.id_map).astype('int64')
+        embeddings = self._base_index().reconstruct_n(0, self.index.ntotal)
+        ivfpq.train(embeddings)
+        ivfpq.add_with_ids(embeddings, ids)
+        self.index = ivfpq
+        self._untrained_ivfpq = None
+
     def index_all_nodes_from_graph(self, db: Neo4jConnection) -> None:
         """Pull all nodes from Neo4j and index them.
         
         Args:
             db: Neo4j database connection
         """
+        self._check_writable()
         # Clear existing index
         self.index.reset()
-        self.metadata.clear()
+        self._clear_metadata()
         
-        # Get all nodes by type
-        node_types = [FailureMode, Observation, SensorReading]
-        all_nodes = []
-        
-        for node_type in node_types:
-            nodes = db.get_nodes_by_type(node_type.__name__)
-            all_nodes.extend(nodes)
+        # Get all nodes of every type in one query
+        all_nodes = db.get_nodes_by_types(INDEXED_NODE_TYPES)
             
         # If no nodes found, return early
         if not all_nodes:
             return
             
-        # Index each node
-        embeddings = []
-        for node in all_nodes:
-            text = self._generate_text(node)
-            embedding = self._embed_text(text)
-            embeddings.append(embedding)
-            
-            self.metadata.append({
-                "id": node.id,
-                "name": node.name,
-                "type": node.type,
-                "description": node.description
-            })
-            
+        # Embed all nodes in batched forward passes
+        texts = [self._generate_text(node) for node in all_nodes]
+        embeddings_array = self._embed_texts(texts)
+
         # Add to FAISS index
-        embeddings_array = np.array(embeddings).astype('float32')
-        self.index.add(embeddings_array)
+        self._add_embeddings(embeddings_array)
+        self._append_metadata(all_nodes, [self._content_hash(text) for text in texts])
+
+    def load_or_build(self, db: Neo4jConnection, directory: Union[str, Path]) -> None:
+        """Load a saved index and bring it up to date with the graph.
+        
+        Only nodes that are new or whose name/description changed since the
+        index was saved are re-embedded; vectors for unchanged nodes are reused.
+        The refreshed index is saved back to the directory if anything changed.
+        
+        Args:
+            db: Neo4j database connection
+            directory: Directory the index is saved in (see save/load)
+        """
+        directory = Path(directory)
+        if (directory / "index.faiss").exists():
+            # Read fully into memory: the index is rebuilt in place below and
+            # the caller goes on adding nodes to it
+            self.load(directory, mmap=False)
+
+        # Map (node id, content hash) -> FAISS id of the stored vector
+        cached = {
+            key: position
+            for position, key in enumerate(zip(self._ids, self._content_hashes))
+            if key[0] is not None
+        }
+
+        all_nodes = db.get_nodes_by_types(INDEXED_NODE_TYPES)
+
+        # Every row is filled below, from the cache or the encoder
+        embeddings = np.empty((len(all_nodes), self.index.d), dtype='float32')
+        content_hashes = []
+        stale_rows = []
+        stale_texts = []
+        for row, node in enumerate(all_nodes):
+            text = self._generate_text(node)
+            content_hash = self._content_hash(text)
+            position = cached.get((node.id, content_hash))
+            if position is None:
+                stale_rows.append(row)
+                stale_texts.append(text)
+            else:
+                embeddings[row] = self.index.reconstruct(position)
+            content_hashes.append(content_hash)
+
+        if stale_texts:
+            embeddings[stale_rows] = self._embed_texts(stale_texts)
+
+        # Nothing new, changed or removed: the loaded index is already current
+        if not stale_rows and len(all_nodes) == len(self._ids):
+            return
+
+        self.index.reset()
+        self._clear_metadata()
+        if len(all_nodes):
+            self._add_embeddings(embeddings)
+        self._append_metadata(all_nodes, content_hashes)
+        self.save(directory)
         
     def search(self, query_text: str, k: int = 5) -> List[SearchResult]:
         """Search for nodes similar to the query text.
@@ -125,49 +415,155 @@ class NodeVectorIndex:
         Returns:
             List of SearchResult objects
         """
-        # Embed query
-        query_embedding = self._embed_text(query_text)
-        query_embedding = np.array([query_embedding]).astype('float32')
+        # Embed query as a (1, d) float32 batch, reusing the vector for repeated queries
+        query_embedding = np.frombuffer(
+            self._query_embedding_cache(query_text), dtype='float32'
+        ).reshape(1, -1)
+        return self.search_embeddings(query_embedding, k)[0]
+
+    def search_batch(self, queries: List[str], k: int = 5) -> List[List[SearchResult]]:
+        """Search for nodes similar to each of several query texts.
+        
+        All queries are embedded together and looked up in one FAISS search.
+        
+        Args:
+            queries: Texts to search for
+            k: Number of results to return per query
+            
+        Returns:
+            One list of SearchResult objects per query, in query order
+        """
+        if not queries:
+            return []
+        return self.search_embeddings(self._embed_texts(queries), k)
+
+    def embed_nodes(self, nodes: List[Node], batch_size: int = 64) -> np.ndarray:
+        """Embed the canonical text of several nodes in batches.
+        
+        Args:
+            nodes: Nodes to embed
+            batch_size: Number of texts to encode per model forward pass
+        
+        Returns:
+            Unit-length float32 array of shape (len(nodes), dimension)
+        """
+        return self._embed_texts([self._generate_text(node) for node in nodes], batch_size)
+
+    def pairwise_scores(self, embeddings: np.ndarray) -> np.ndarray:
+        """Score every pair of embeddings on the same scale as search results.
+        
+        Args:
+            embeddings: Unit-length float32 array of shape (n, dimension), e.g. from embed_nodes
+        
+        Returns:
+            float32 array of shape (n, n)
+        """
+        cosine = np.matmul(embeddings, embeddings.T)
+        if self.index.metric_type == faiss.METRIC_INNER_PRODUCT:
+            return cosine
+        # Squared L2 distance between unit vectors is 2 - 2 * cosine
+        return 1.0 / (1.0 + np.maximum(2.0 - 2.0 * cosine, 0.0))
+
+    def search_embeddings(self, query_embeddings: np.ndarray, k: int) -> List[List[SearchResult]]:
+        """Run one FAISS search for a batch of query embeddings.
         
+        Args:
+            query_embeddings: Unit-length float32 array of shape (nq, dimension)
+            k: Number of results to return per query
+            
+        Returns:
+            One list of SearchResult objects per query row
+        """
+        # Widen the HNSW candidate list with k so recall stays near-exact
+        base_index = self._base_index()
+        if isinstance(base_index, faiss.IndexHNSW):
+            base_index.hnsw.efSearch = max(k * 4, 32)
+
         # Search
-        distances, indices = self.index.search(query_embedding, k)
+        distances, indices = self.index.search(query_embeddings, k)
         
+        # Vectors are unit length, so inner product is already cosine similarity;
+        # L2 distances are converted to similarity scores for the whole batch at once
+        if self.index.metric_type == faiss.METRIC_INNER_PRODUCT:
+            scores = distances
+        else:
+            scores = 1.0 / (1.0 + distances)
+
         # Format results
-        results = []
-        for idx, (distance, index) in enumerate(zip(distances[0], indices[0])):
-            if index == -1:  # FAISS returns -1 for empty slots
-                continue
+        all_results = []
+        for row_scores, row_indices in zip(scores.tolist(), indices.tolist()):
+            results = []
+            for score, index in zip(row_scores, row_indices):
+                if index == -1:  # FAISS returns -1 for empty slots
+                    continue
                 
-            metadata = self.metadata[index]
-            score = 1.0 / (1.0 + distance)  # Convert distance to similarity score
-            
-            results.append(SearchResult(
-                id=metadata["id"],
-                name=metadata["name"],
-                type=metadata["type"],
-                description=metadata.get("description"),
-                score=float(score)
-            ))
+                # Positional in field order (id, name, type, score, description);
+                # the dataclass does no validation, so this is all the work done
+                results.append(SearchResult(
+                    self._ids[index],
+                    self._names[index],
+                    self._types[index],
+                    score,
+                    self._descriptions[index],
+                ))
+            all_results.append(results)
             
-        return results
-        
+        return all_results
+
     def add_node_to_index(self, node: Node) -> None:
         """Add a single node to the index.
         
         Args:
             node: Node to add
         """
-        text = self._generate_text(node)
-        embedding = self._embed_text(text)
-        embedding = np.array([embedding]).astype('float32')
+        self.add_nodes_to_index([node])
+        
+    def add_nodes_to_index(self, nodes: List[Node], batch_size: int = 64,
+                           embeddings: Optional[np.ndarray] = None) -> None:
+        """Add several nodes to the index, embedding them in batches.
+        
+        Args:
+            nodes: Nodes to add
+            batch_size: Number of texts to encode per model forward pass
+            embeddings: Embeddings of nodes already computed by embed_nodes, one row
+                per node. If None, the nodes are embedded here.
+        """
+        if not nodes:
+            return
+
+        texts = [self._generate_text(node) for node in nodes]
+        if embeddings is None:
+            embeddings = self._embed_texts(texts, batch_size)
+        elif len(embeddings) != len(nodes):
+            raise ValueError(f"Expected {len(nodes)} embeddings, got {len(embeddings)}")
+        self._add_embeddings(embeddings)
+        self._append_metadata(nodes, [self._content_hash(text) for text in texts])
+        
+    def remove_nodes(self, node_ids: List[str]) -> int:
+        """Remove nodes from the index so they can be re-added after a change.
         
-        self.index.add(embedding)
-        self.metadata.append({
-            "id": node.id,
-            "name": node.name,
-            "type": node.type,
-            "description": node.description
-        })
+        Not supported by the 'hnsw' index type.
+        
+        Args:
+            node_ids: Neo4j IDs of the nodes to remove
+            
+        Returns:
+            Number of vectors removed
+        """
+        self._check_writable()
+        targets = set(node_ids)
+        positions = [position for position, node_id in enumerate(self._ids) if node_id in targets]
+        if not positions:
+            return 0
+
+        self.index.remove_ids(np.array(positions, dtype='int64'))
+        for position in positions:
+            self._ids[position] = None
+            self._names[position] = None
+            self._types[position] = None
+            self._descriptions[position] = None
+            self._content_hashes[position] = None
+        return len(positions)
         
     def save(self, directory: Union[str, Path]) -> None:
         """Save the index and metadata to disk.
@@ -182,20 +578,44 @@ class NodeVectorIndex:
         faiss.write_index(self.index, str(directory / "index.faiss"))
         
         # Save metadata
-        with open(directory / "metadata.json", "w") as f:
-            json.dump(self.metadata, f)
+        if orjson is not None:
+            with open(directory / "metadata.json", "wb") as f:
+                f.write(orjson.dumps(self.metadata))
+        else:
+            with open(directory / "metadata.json", "w") as f:
+                json.dump(self.metadata, f)
             
-    def load(self, directory: Union[str, Path]) -> None:
+    def load(self, directory: Union[str, Path], mmap: bool = False) -> None:
         """Load the index and metadata from disk.
         
+        With mmap=True, a trained 'ivfpq' index keeps its inverted lists in the
+        file, memory-mapped, instead of copying them into RAM. Processes loading
+        the same file then share its pages. Such an index is read-only, so adding
+        or removing nodes afterwards raises ValueError; use this for search-only
+        processes. Other index types are always read fully into memory.
+        
         Args:
             directory: Directory containing saved files
+            mmap: Whether to memory-map the inverted lists of an IVF index
         """
         directory = Path(directory)
+        index_file = directory / "index.faiss"
         
-        # Load FAISS index
-        self.index = faiss.read_index(str(directory / "index.faiss"))
+        # Load FAISS index. Only IVF indexes can be mapped; FAISS ignores the flag
+        # for the others, so only pass it when the file's type code names one
+        with open(index_file, "rb") as f:
+            is_ivf = f.read(4)[:2] in IVF_FOURCC_PREFIXES
+        self._read_only = mmap and is_ivf
+        io_flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY if self._read_only else 0
+        self.index = faiss.read_index(str(index_file), io_flags)
+        if isinstance(self.index, faiss.IndexIVF):
+            # A trained index was saved; nothing is staged any more
+            self._untrained_ivfpq = None
         
         # Load metadata
-        with open(directory / "metadata.json", "r") as f:
-            self.metadata = json.load(f) 
\ No newline at end of file
+        if orjson is not None:
+            with open(directory / "metadata.json", "rb") as f:
+                self.metadata = orjson.loads(f.read())
+        else:
+            with open(directory / "metadata.json", "r") as f:
+                self.metadata = json.load(f) 
\ No newline at end of file
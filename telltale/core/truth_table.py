@@ -5,11 +5,26 @@ for diagnostic graphs, allowing users to systematically explore how different
 combinations of observations and sensor values affect diagnostic outcomes.
 """
 
+import hashlib
 import itertools
-from typing import Dict, List, Set, Any, Tuple, Optional, Union
+import logging
+import os
+import shutil
+import tempfile
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Set, Any, TextIO, Tuple, Optional, Union
 import csv
 import io
 import json
+from pathlib import Path
+
+import numpy as np
+try:
+    import orjson
+except ImportError:  # optional speedup; fall back to the standard library
+    orjson = None
 from pydantic import BaseModel
 
 from telltale.core.models import (
@@ -18,6 +33,76 @@ from telltale.core.models import (
 )
 from telltale.core.diagnostic import DiagnosticEngine
 
+logger = logging.getLogger(__name__)
+
+# Offsets from each sensor threshold for the just-below and just-above test values
+THRESHOLD_OFFSETS = np.array([-0.1, 0.1])
+
+# Test cases in flight per worker thread when run_truth_table runs on a pool;
+# bounds how far ahead of the results the test case iterable is consumed
+PENDING_CASES_PER_WORKER = 4
+
+
+# (failure mode, confidence value) pairs, in the diagnostic engine's order
+DiagnosisPairs = Tuple[Tuple[str, str], ...]
+
+
+def _diagnosis_list(pairs: DiagnosisPairs) -> List[Dict[str, Any]]:
+    """Build a list of diagnosis dicts from (failure mode, confidence) pairs.
+    
+    Args:
+        pairs: (failure mode, confidence value) pairs, in order
+        
+    Returns:
+        New list of dicts with 'failure_mode' and 'confidence' keys
+    """
+    return [
+        {
+            "failure_mode": failure_mode,
+            "confidence": confidence
+        }
+        for failure_mode, confidence in pairs
+    ]
+
+
+def _dumps_diagnoses(pairs: DiagnosisPairs, cache: Dict[tuple, str]) -> str:
+    """JSON-encode diagnoses as a list of dicts, reusing the encoding of identical ones.
+    
+    Output is compact UTF-8 JSON whether or not orjson is installed.
+    
+    Args:
+        pairs: (failure mode, confidence value) pairs, in order
+        cache: Encodings by pairs, shared for one output
+        
+    Returns:
+        JSON string for the list
+    """
+    encoded = cache.get(pairs)
+    if encoded is None:
+        diagnoses = _diagnosis_list(pairs)
+        if orjson is not None:
+            encoded = orjson.dumps(diagnoses).decode("utf-8")
+        else:
+            encoded = json.dumps(diagnoses, separators=(",", ":"), ensure_ascii=False)
+        cache[pairs] = encoded
+    return encoded
+
+
+def _observation_mask(observations: Iterable[str], obs_bits: Dict[str, int]) -> int:
+    """Pack the observations present in a test case into an integer bitmask.
+    
+    Args:
+        observations: Names of the observations present
+        obs_bits: Bit for each observation column, from the sorted column order
+        
+    Returns:
+        Bitmask with the bit of every present observation set
+    """
+    mask = 0
+    for obs in observations:
+        mask |= obs_bits[obs]
+    return mask
+
 
 class ExpectedOutcome(BaseModel):
     """Represents an expected diagnostic outcome for a test case."""
@@ -32,71 +117,302 @@ class TestCase(BaseModel):
 
 
 class TruthTableResult(BaseModel):
-    """Represents the result of a single test in the truth table."""
+    """Represents the result of a single test in the truth table.
+    
+    Diagnoses are stored as immutable (failure mode, confidence) pairs, shared with
+    the diagnosis cache instead of copied into every result. The list-of-dict views
+    (diagnosed_failure_modes etc.) are built on each access, so modifying one does
+    not change the result.
+    """
     inputs: Dict[str, Any]  # The input combination tested
-    diagnosed_failure_modes: List[Dict[str, Any]]  # The actual diagnoses
-    expected_failure_modes: List[Dict[str, Any]]  # The expected diagnoses
-    unexpected_results: List[Dict[str, Any]]  # Results not in expected list
-    missing_results: List[Dict[str, Any]]  # Expected results not found
+    diagnosed_pairs: DiagnosisPairs  # The actual diagnoses
+    expected_pairs: DiagnosisPairs  # The expected diagnoses
+    unexpected_pairs: DiagnosisPairs  # Results not in expected list
+    missing_pairs: DiagnosisPairs  # Expected results not found
     has_surprise: bool  # True if there are unexpected or missing results
 
+    @property
+    def diagnosed_failure_modes(self) -> List[Dict[str, Any]]:
+        """The actual diagnoses, as dicts with 'failure_mode' and 'confidence' keys."""
+        return _diagnosis_list(self.diagnosed_pairs)
+
+    @property
+    def expected_failure_modes(self) -> List[Dict[str, Any]]:
+        """The expected diagnoses, as dicts with 'failure_mode' and 'confidence' keys."""
+        return _diagnosis_list(self.expected_pairs)
+
+    @property
+    def unexpected_results(self) -> List[Dict[str, Any]]:
+        """Diagnoses not in the expected list, as dicts."""
+        return _diagnosis_list(self.unexpected_pairs)
+
+    @property
+    def missing_results(self) -> List[Dict[str, Any]]:
+        """Expected diagnoses that were not made, as dicts."""
+        return _diagnosis_list(self.missing_pairs)
+
 
 class TruthTable:
     """Class for generating and evaluating truth tables for diagnostic graphs."""
 
-    def __init__(self, diagnostic_engine: DiagnosticEngine):
+    def __init__(self, diagnostic_engine: DiagnosticEngine,
+                 cache_dir: Optional[Union[str, Path]] = None):
         """Initialize the truth table generator.
         
         Args:
             diagnostic_engine: The diagnostic engine to use for evaluations
+            cache_dir: Optional directory to keep diagnoses in across runs. Entries
+                are grouped under a fingerprint of the graph taken by scan_graph,
+                so a changed graph never reuses old diagnoses.
         """
         self.diagnostic_engine = diagnostic_engine
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self._graph_hash: Optional[str] = None
+        self._disk_hits = 0
+        self._disk_misses = 0
         
         # Initialize storage for inputs and expected outputs
         self.observations: Set[str] = set()
         self.sensor_readings: Dict[str, Dict[str, Any]] = {}
         self.expected_outcomes: List[TestCase] = []
+        # Registered test cases by canonical inputs key, for O(1) lookup per test case
+        self._expected_index: Dict[Tuple[frozenset, tuple], TestCase] = {}
+        # Diagnoses by canonical inputs key; cleared when the graph is rescanned
+        self._diagnose_cached = lru_cache(maxsize=4096)(self._diagnose)
+        self._scanned = False
         
-    def scan_graph(self) -> None:
-        """Scan the Neo4j graph to identify all observations and sensor readings."""
-        # Query for all observation nodes
-        obs_query = """
-        MATCH (o:Observation)
-        RETURN o.name as name
+    @staticmethod
+    def _inputs_key(observations: Iterable[str], sensor_values: Dict[str, Any]) -> Tuple[frozenset, tuple]:
+        """Build a hashable key identifying a combination of inputs.
+        
+        Observation order doesn't matter, matching how test cases are compared.
+        
+        Args:
+            observations: Names of the observations present
+            sensor_values: Sensor names mapped to their values
+            
+        Returns:
+            Tuple of the observation set and the sorted sensor value items
         """
-        obs_results = self.diagnostic_engine.db.run_query(obs_query)
-        for result in obs_results:
-            self.observations.add(result["name"])
+        return frozenset(observations), tuple(sorted(sensor_values.items()))
+        
+    def _diagnose(self, obs_key: frozenset, sv_key: tuple) -> Tuple[Tuple[str, str], ...]:
+        """Run the diagnostic engine for one combination of inputs.
+        
+        Args:
+            obs_key: Observation set, as built by _inputs_key
+            sv_key: Sorted sensor value items, as built by _inputs_key
             
-        # Query for all sensor reading nodes and their evidence relationships
-        sensor_query = """
+        Returns:
+            (failure mode, confidence value) pairs in the engine's order
+        """
+        # Second tier behind the in-memory LRU: diagnoses saved by earlier runs
+        cache_file = self._disk_cache_file(obs_key, sv_key)
+        if cache_file is not None:
+            pairs = self._read_disk_cache(cache_file)
+            if pairs is not None:
+                self._disk_hits += 1
+                return pairs
+        
+        diagnoses = self.diagnostic_engine.diagnose(
+            observations=list(obs_key),
+            sensor_readings=dict(sv_key)
+        )
+        pairs = tuple((d.failure_mode, d.confidence.value) for d in diagnoses)
+        
+        if cache_file is not None:
+            self._disk_misses += 1
+            self._write_disk_cache(cache_file, pairs)
+        return pairs
+    
+    @staticmethod
+    def _read_disk_cache(cache_file: Path) -> Optional[Tuple[Tuple[str, str], ...]]:
+        """Read one diagnosis from the disk cache.
+        
+        An unreadable entry (e.g. left truncated by an older version) is
+        deleted and treated as a miss.
+        
+        Args:
+            cache_file: Path from _disk_cache_file
+            
+        Returns:
+            (failure mode, confidence value) pairs, or None on a miss
+        """
+        try:
+            with open(cache_file, "r") as f:
+                return tuple((failure_mode, confidence) for failure_mode, confidence in json.load(f))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError):
+            cache_file.unlink(missing_ok=True)
+            return None
+    
+    @staticmethod
+    def _write_disk_cache(cache_file: Path, pairs: Tuple[Tuple[str, str], ...]) -> None:
+        """Write one diagnosis to the disk cache atomically.
+        
+        The entry is written to a temporary file in the same directory and
+        renamed into place, so readers (including other threads writing the
+        same key) never see a partial file.
+        
+        Args:
+            cache_file: Path from _disk_cache_file
+            pairs: (failure mode, confidence value) pairs to store
+        """
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_file.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(pairs, f)
+            os.replace(tmp_path, cache_file)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    
+    def _disk_cache_file(self, obs_key: frozenset, sv_key: tuple) -> Optional[Path]:
+        """Get the on-disk cache file for one combination of inputs.
+        
+        Args:
+            obs_key: Observation set, as built by _inputs_key
+            sv_key: Sorted sensor value items, as built by _inputs_key
+            
+        Returns:
+            Path of the cache file, or None if there is no disk cache (no
+            cache_dir, or the graph hasn't been scanned yet)
+        """
+        if self.cache_dir is None or self._graph_hash is None:
+            return None
+        key = json.dumps([sorted(obs_key), sv_key])
+        return self.cache_dir / self._graph_hash / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.json"
+    
+    def _graph_fingerprint(self) -> str:
+        """Hash everything in the graph that diagnoses depend on.
+        
+        Returns:
+            Hex digest over the scanned observations and every CAUSES and
+            EVIDENCE_FOR relationship with its properties
+        """
+        query = """
+        MATCH (source)-[r:CAUSES|EVIDENCE_FOR]->(dest)
+        RETURN 
+            source.name as source,
+            type(r) as type,
+            properties(r) as properties,
+            dest.name as dest
+        """
+        results = self.diagnostic_engine.db.run_query(query)
+        
+        digest = hashlib.sha256()
+        digest.update(json.dumps(sorted(self.observations)).encode("utf-8"))
+        for row in sorted(json.dumps(result, sort_keys=True, default=str) for result in results):
+            digest.update(b"\n")
+            digest.update(row.encode("utf-8"))
+        return digest.hexdigest()
+    
+    def clear_cache(self) -> None:
+        """Clear cached diagnoses, in memory and on disk for the current graph."""
+        self._diagnose_cached.cache_clear()
+        if self.cache_dir is not None and self._graph_hash is not None:
+            shutil.rmtree(self.cache_dir / self._graph_hash, ignore_errors=True)
+        self._disk_hits = 0
+        self._disk_misses = 0
+    
+    def cache_stats(self) -> Dict[str, int]:
+        """Get hit and miss counts for the diagnosis caches.
+        
+        Returns:
+            Dict with memory_hits, memory_misses, disk_hits and disk_misses
+        """
+        info = self._diagnose_cached.cache_info()
+        return {
+            "memory_hits": info.hits,
+            "memory_misses": info.misses,
+            "disk_hits": self._disk_hits,
+            "disk_misses": self._disk_misses,
+        }
+        
+    def scan_graph(self, refresh: bool = False) -> None:
+        """Scan the Neo4j graph to identify all observations and sensor readings.
+        
+        The graph is only queried on the first call; later calls reuse that
+        scan unless refresh is set.
+        
+        Args:
+            refresh: Rescan the graph, e.g. after it has been modified
+        """
+        if self._scanned and not refresh:
+            return
+        
+        # Diagnoses cached from a previous scan may no longer match the graph
+        self._diagnose_cached.cache_clear()
+        self.observations.clear()
+        self.sensor_readings.clear()
+        
+        # Query for all observation nodes and all sensor reading evidence
+        # relationships in one round trip
+        query = """
+        MATCH (o:Observation)
+        RETURN 
+            'observation' as kind,
+            o.name as name,
+            null as unit,
+            null as operator,
+            null as threshold
+        UNION ALL
         MATCH (s:SensorReading)-[e:EVIDENCE_FOR]->(fm:FailureMode)
         RETURN 
-            s.name as sensor_name,
+            'sensor' as kind,
+            s.name as name,
             s.unit as unit,
             e.operator as operator,
             e.threshold as threshold
         """
-        sensor_results = self.diagnostic_engine.db.run_query(sensor_query)
+        results = self.diagnostic_engine.db.run_query(query)
         
-        # Group sensors and their thresholds
+        sensor_results = []
+        for result in results:
+            if result["kind"] == "observation":
+                self.observations.add(result["name"])
+            else:
+                sensor_results.append(result)
+        
+        # Group sensors and their thresholds. Dicts keyed on a hashable form of each
+        # value act as insertion-ordered sets, so deduplication is O(1) per row and
+        # first-seen order is kept; list thresholds are keyed as tuples
         for result in sensor_results:
-            sensor_name = result["sensor_name"]
+            sensor_name = result["name"]
             if sensor_name not in self.sensor_readings:
                 self.sensor_readings[sensor_name] = {
                     "unit": result["unit"],
-                    "thresholds": [],
-                    "operators": []
+                    "thresholds": {},
+                    "operators": {}
                 }
             
-            threshold = result["threshold"]
-            operator = result["operator"]
-            
-            if threshold not in self.sensor_readings[sensor_name]["thresholds"]:
-                self.sensor_readings[sensor_name]["thresholds"].append(threshold)
+            for field, value in (("thresholds", result["threshold"]), ("operators", result["operator"])):
+                self.sensor_readings[sensor_name][field].setdefault(self._hashable(value), value)
+        
+        for sensor_info in self.sensor_readings.values():
+            sensor_info["thresholds"] = list(sensor_info["thresholds"].values())
+            sensor_info["operators"] = list(sensor_info["operators"].values())
+        
+        if self.cache_dir is not None:
+            self._graph_hash = self._graph_fingerprint()
+        
+        self._scanned = True
+    
+    @staticmethod
+    def _hashable(value: Any) -> Any:
+        """Return a hashable stand-in for a property value read from the graph.
+        
+        Args:
+            value: Property value; Neo4j list properties arrive as Python lists
             
-            if operator not in self.sensor_readings[sensor_name]["operators"]:
-                self.sensor_readings[sensor_name]["operators"].append(operator)
+        Returns:
+            The value, with lists converted to tuples
+        """
+        if isinstance(value, list):
+            return tuple(value)
+        return value
     
     def register_expected_outcome(self, test_case: Dict[str, Any]) -> None:
         """Register an expected outcome for a specific test case.
@@ -119,25 +435,33 @@ class TruthTable:
         )
         
         self.expected_outcomes.append(test_case_model)
+        
+        # A later registration for the same inputs replaces the earlier one
+        key = self._inputs_key(
+            test_case_model.inputs.get("observations", []),
+            test_case_model.inputs.get("sensor_values", {})
+        )
+        self._expected_index[key] = test_case_model
     
     def generate_test_cases(self, 
                            vary_observations: Optional[List[str]] = None,
                            fixed_observations: Optional[Dict[str, bool]] = None,
                            vary_sensors: Optional[List[str]] = None,
-                           fixed_sensor_values: Optional[Dict[str, float]] = None) -> List[Dict[str, Any]]:
+                           fixed_sensor_values: Optional[Dict[str, float]] = None) -> Iterator[Dict[str, Any]]:
         """Generate test case combinations based on specified inputs to vary and fix.
         
+        Test cases are yielded one at a time, so the full combination space is
+        never held in memory; wrap the call in list() if a list is needed.
+        
         Args:
             vary_observations: List of observation names to vary (True/False/Unknown)
             fixed_observations: Dict of observation names with fixed True values
             vary_sensors: List of sensor names to vary values for
             fixed_sensor_values: Dict of sensor names with fixed values
             
-        Returns:
-            List of input combinations, each a dict with 'observations' and 'sensor_values'.
+        Yields:
+            Input combinations, each a dict with 'observations' and 'sensor_values'.
         """
-        test_cases = []
-        
         # Initialize with default empty values if not provided
         if vary_observations is None:
             vary_observations = []
@@ -152,60 +476,80 @@ class TruthTable:
         if not vary_observations and not fixed_observations:
             vary_observations = list(self.observations)
         
-        # Generate all combinations of varying observations (present or absent)
-        observation_combinations = [[]]  # Start with empty list for no observations
-        for r in range(1, len(vary_observations) + 1):
-            for combo in itertools.combinations(vary_observations, r):
-                observation_combinations.append(list(combo))
+        # Generate all combinations of varying observations (present or absent),
+        # lazily and as tuples, starting with the empty combination
+        observation_combinations = itertools.chain.from_iterable(
+            itertools.combinations(vary_observations, r)
+            for r in range(len(vary_observations) + 1)
+        )
         
         # For each sensor to vary, generate test values around each threshold
-        sensor_value_combinations = [{}]  # Start with empty dict for no sensor readings
+        sensor_names = [name for name in vary_sensors if name in self.sensor_readings]
+        sensor_value_lists = []
+        for sensor_name in sensor_names:
+            thresholds = self._numeric_thresholds(sensor_name)
+            
+            # Generate values around each threshold regardless of operators: just
+            # below and just above (computed for all thresholds at once), then
+            # exactly at the threshold as stored in the graph
+            offset_values = (
+                np.asarray(thresholds, dtype=np.float64)[:, np.newaxis] + THRESHOLD_OFFSETS
+            ).tolist()
+            sensor_test_values = [
+                value
+                for (below, above), threshold in zip(offset_values, thresholds)
+                for value in (below, above, threshold)
+            ]
+            
+            # Add a null value to simulate no sensor data
+            sensor_test_values.append(None)
+            sensor_value_lists.append(sensor_test_values)
         
-        for sensor_name in vary_sensors:
-            if sensor_name in self.sensor_readings:
-                sensor_info = self.sensor_readings[sensor_name]
-                sensor_test_values = []
-                
-                for threshold in sensor_info["thresholds"]:
-                    # Generate values around each threshold regardless of operators
-                    sensor_test_values.append(threshold - 0.1)  # Just below
-                    sensor_test_values.append(threshold + 0.1)  # Just above
-                    sensor_test_values.append(threshold)  # Exactly at threshold
-                
-                # Add a null value to simulate no sensor data
-                sensor_test_values.append(None)
-                
-                # Create new combinations by adding each test value to existing combinations
-                new_combinations = []
-                for existing in sensor_value_combinations:
-                    for value in sensor_test_values:
-                        new_combo = existing.copy()
-                        if value is not None:  # Skip None values
-                            new_combo[sensor_name] = value
-                        new_combinations.append(new_combo)
-                
-                sensor_value_combinations = new_combinations
+        # One tuple of values (parallel to sensor_names) per sensor combination
+        sensor_value_combinations = list(itertools.product(*sensor_value_lists))
         
         # Generate all combinations of observations and sensor values
         for obs_combo in observation_combinations:
             # Add fixed observations to each combo
-            full_obs = obs_combo.copy()
+            full_obs = list(obs_combo)
             for obs, present in fixed_observations.items():
                 if present and obs not in full_obs:
                     full_obs.append(obs)
             
             for sensor_combo in sensor_value_combinations:
-                # Add fixed sensor values to each combo
-                full_sensors = sensor_combo.copy()
-                for sensor, value in fixed_sensor_values.items():
-                    full_sensors[sensor] = value
+                # Skip None values, then add fixed sensor values to each combo
+                full_sensors = {
+                    sensor: value
+                    for sensor, value in zip(sensor_names, sensor_combo)
+                    if value is not None
+                }
+                full_sensors.update(fixed_sensor_values)
                 
-                test_cases.append({
+                yield {
                     "observations": full_obs,
                     "sensor_values": full_sensors
-                })
+                }
+
+    def _numeric_thresholds(self, sensor_name: str) -> List[Union[int, float]]:
+        """List the numeric values to generate sensor test values around.
+        
+        Each member of a list threshold (used with the 'in' operator) is treated as a
+        threshold of its own. Missing and non-numeric thresholds are left out.
         
-        return test_cases
+        Args:
+            sensor_name: Name of a scanned sensor
+            
+        Returns:
+            Numeric thresholds without repeats, in first-seen order
+        """
+        numeric = {}
+        for threshold in self.sensor_readings[sensor_name]["thresholds"]:
+            for value in threshold if isinstance(threshold, list) else [threshold]:
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    numeric.setdefault(value, None)
+                else:
+                    logger.warning(f"Skipping non-numeric threshold {value!r} for sensor {sensor_name}")
+        return list(numeric)
 
     def run_test_case(self, test_case: Dict[str, Any]) -> TruthTableResult:
         """Run the diagnostic engine on a single test case.
@@ -216,58 +560,38 @@ class TruthTable:
         Returns:
             TruthTableResult with the test case results.
         """
-        # Run the diagnostic engine
-        diagnoses = self.diagnostic_engine.diagnose(
-            observations=test_case["observations"],
-            sensor_readings=test_case["sensor_values"]
-        )
+        inputs_key = self._inputs_key(test_case["observations"], test_case["sensor_values"])
         
-        # Convert diagnoses to a standard format for comparison
-        actual_results = [
-            {
-                "failure_mode": d.failure_mode,
-                "confidence": d.confidence.value
-            }
-            for d in diagnoses
-        ]
+        # Run the diagnostic engine, reusing the diagnosis for inputs already seen
+        actual_pairs = self._diagnose_cached(*inputs_key)
         
         # Find the expected outcomes for this exact input, if any
-        expected_results = []
-        has_registered_expectations = False
-        for expected in self.expected_outcomes:
-            # Check if this expected outcome matches our test case
-            if (set(expected.inputs.get("observations", [])) == set(test_case["observations"]) and
-                expected.inputs.get("sensor_values", {}) == test_case["sensor_values"]):
-                has_registered_expectations = True
-                expected_results = [
-                    {
-                        "failure_mode": e.failure_mode,
-                        "confidence": e.confidence.value
-                    }
-                    for e in expected.expected
-                ]
+        expected = self._expected_index.get(inputs_key)
+        has_registered_expectations = expected is not None
+        expected_pairs = ()
+        if has_registered_expectations:
+            expected_pairs = tuple((e.failure_mode, e.confidence.value) for e in expected.expected)
         
         # Identify unexpected and missing results
-        unexpected = []
-        missing = []
+        unexpected_pairs = ()
+        missing_pairs = ()
         
-        # Only look for unexpected/missing results if we have registered expectations
+        # Only look for unexpected/missing results if we have registered expectations.
+        # Compare (failure mode, confidence) pairs through sets, keeping list order
         if has_registered_expectations:
-            for actual in actual_results:
-                if actual not in expected_results:
-                    unexpected.append(actual)
-            
-            for expected in expected_results:
-                if expected not in actual_results:
-                    missing.append(expected)
+            actual_set = set(actual_pairs)
+            expected_set = set(expected_pairs)
+            unexpected_pairs = tuple(pair for pair in actual_pairs if pair not in expected_set)
+            missing_pairs = tuple(pair for pair in expected_pairs if pair not in actual_set)
         
-        return TruthTableResult(
+        # Every field is built above from trusted values, so skip validation
+        return TruthTableResult.model_construct(
             inputs=test_case,
-            diagnosed_failure_modes=actual_results,
-            expected_failure_modes=expected_results,
-            unexpected_results=unexpected,
-            missing_results=missing,
-            has_surprise=(has_registered_expectations and (len(unexpected) > 0 or len(missing) > 0))
+            diagnosed_pairs=actual_pairs,
+            expected_pairs=expected_pairs,
+            unexpected_pairs=unexpected_pairs,
+            missing_pairs=missing_pairs,
+            has_surprise=(has_registered_expectations and (len(unexpected_pairs) > 0 or len(missing_pairs) > 0))
         )
     
     def run_truth_table(self, 
@@ -275,7 +599,8 @@ class TruthTable:
                         fixed_observations: Optional[Dict[str, bool]] = None,
                         vary_sensors: Optional[List[str]] = None,
                         fixed_sensor_values: Optional[Dict[str, float]] = None,
-                        test_cases: Optional[List[Dict[str, Any]]] = None) -> List[TruthTableResult]:
+                        test_cases: Optional[Iterable[Dict[str, Any]]] = None,
+                        workers: int = 1) -> List[TruthTableResult]:
         """Run test cases through the diagnostic engine.
         
         Args:
@@ -283,7 +608,12 @@ class TruthTable:
             fixed_observations: Dict of observation names with fixed values
             vary_sensors: List of sensor names to vary values for
             fixed_sensor_values: Dict of sensor names with fixed values
-            test_cases: Optional list of pre-defined test cases. If provided, other parameters are ignored.
+            test_cases: Optional iterable of pre-defined test cases. If provided, other parameters are ignored.
+            workers: Number of threads to run test cases on. Test cases are independent,
+                and each diagnosis query opens its own session from the shared
+                (thread-safe) Neo4j driver, so no session is shared between threads.
+                Test cases are still consumed lazily, at most
+                PENDING_CASES_PER_WORKER per worker ahead of the results.
             
         Returns:
             List of TruthTableResult objects.
@@ -296,237 +626,347 @@ class TruthTable:
                 fixed_sensor_values=fixed_sensor_values
             )
         
+        # Generated cases are consumed as they are produced. Identical inputs always
+        # give the same result, so each distinct case is only run once
         results = []
-        for test_case in test_cases:
-            result = self.run_test_case(test_case)
-            results.append(result)
+        if workers <= 1:
+            seen: Dict[Tuple[frozenset, tuple], TruthTableResult] = {}
+            for test_case in test_cases:
+                key = self._inputs_key(test_case["observations"], test_case["sensor_values"])
+                result = seen.get(key)
+                if result is None:
+                    result = seen[key] = self.run_test_case(test_case)
+                else:
+                    result = self._with_inputs(result, test_case)
+                results.append(result)
+            return results
+        
+        # Same on a thread pool, with a bounded window of cases in flight; results
+        # are collected in test case order
+        submitted: Dict[Tuple[frozenset, tuple], Future] = {}
+        pending: deque = deque()
+        max_pending = workers * PENDING_CASES_PER_WORKER
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for test_case in test_cases:
+                key = self._inputs_key(test_case["observations"], test_case["sensor_values"])
+                future = submitted.get(key)
+                is_first = future is None
+                if is_first:
+                    future = submitted[key] = executor.submit(self.run_test_case, test_case)
+                pending.append((test_case, future, is_first))
+                if len(pending) >= max_pending:
+                    results.append(self._collect(*pending.popleft()))
+            while pending:
+                results.append(self._collect(*pending.popleft()))
         
         return results
     
+    @staticmethod
+    def _with_inputs(result: TruthTableResult, test_case: Dict[str, Any]) -> TruthTableResult:
+        """Copy a result for another test case with the same canonical inputs.
+        
+        Args:
+            result: Result already computed for identical inputs
+            test_case: The test case the copy is for
+            
+        Returns:
+            Copy of result with the test case's own inputs (observation order may
+            differ); the immutable diagnosis pairs are shared
+        """
+        return result.model_copy(update={"inputs": test_case})
+    
+    def _collect(self, test_case: Dict[str, Any], future: Future, is_first: bool) -> TruthTableResult:
+        """Wait for a result submitted by run_truth_table.
+        
+        Args:
+            test_case: The test case the result is for
+            future: Future running (or shared with) this test case
+            is_first: Whether the future was submitted for this test case
+            
+        Returns:
+            The test case's result
+        """
+        result = future.result()
+        return result if is_first else self._with_inputs(result, test_case)
+    
     def format_results(self, 
                       results: List[TruthTableResult], 
                       only_surprises: bool = False, 
-                      format: str = 'text') -> str:
+                      format: str = 'text',
+                      sink: Optional[TextIO] = None) -> str:
         """Format test results in a readable format.
         
+        Output is written row by row, so with a sink the full text is never
+        held in memory.
+        
         Args:
             results: List of TruthTableResult objects.
             only_surprises: If True, only include unexpected results.
             format: Output format ('text', 'csv', 'html', or 'table').
+            sink: Optional text stream (e.g. an open file) to write the output to.
             
         Returns:
-            String representation of the results.
+            String representation of the results, or an empty string if the
+            output was written to sink.
         """
         if only_surprises:
             results = [r for r in results if r.has_surprise]
             
         if not results:
+            if sink is not None:
+                sink.write("No results to display.")
+                return ""
             return "No results to display."
+        
+        output = sink if sink is not None else io.StringIO()
+        
+        # Column order for the tabular formats, sorted once per call
+        if format in ('csv', 'html', 'table'):
+            sorted_obs, sorted_sensors = self._collect_schema(results)
             
         if format == 'csv':
-            output = io.StringIO()
-            writer = csv.writer(output)
-            
-            # Get all unique observation names and sensor names
-            all_obs = set()
-            all_sensors = set()
-            for result in results:
-                all_obs.update(result.inputs['observations'])
-                all_sensors.update(result.inputs['sensor_values'].keys())
-            
-            # Write header
-            header = []
-            for obs in sorted(all_obs):
-                header.append(f"Obs: {obs}")
-            for sensor in sorted(all_sensors):
-                header.append(f"Sensor: {sensor}")
-            header.extend(['Diagnosed Failure Modes', 'Expected Failure Modes', 
-                          'Unexpected Results', 'Missing Results'])
-            writer.writerow(header)
-            
-            # Write data
-            for result in results:
-                row = []
-                # Add observation values (True/False)
-                for obs in sorted(all_obs):
-                    row.append("Yes" if obs in result.inputs['observations'] else "No")
-                
-                # Add sensor values
-                for sensor in sorted(all_sensors):
-                    row.append(str(result.inputs['sensor_values'].get(sensor, "Unknown")))
-                
-                # Add diagnosis results
-                row.append(json.dumps(result.diagnosed_failure_modes))
-                row.append(json.dumps(result.expected_failure_modes))
-                row.append(json.dumps(result.unexpected_results))
-                row.append(json.dumps(result.missing_results))
-                
-                writer.writerow(row)
-                
-            return output.getvalue()
-            
+            self._write_csv(results, sorted_obs, sorted_sensors, output)
         elif format == 'html':
-            # Get all unique observation names and sensor names
-            all_obs = set()
-            all_sensors = set()
-            for result in results:
-                all_obs.update(result.inputs['observations'])
-                all_sensors.update(result.inputs['sensor_values'].keys())
-            
-            html = ['<table border="1">']
-            
-            # Header
-            html.append('<tr>')
-            for obs in sorted(all_obs):
-                html.append(f'<th>Obs: {obs}</th>')
-            for sensor in sorted(all_sensors):
-                html.append(f'<th>Sensor: {sensor}</th>')
-            html.append('<th>Diagnosed Failure Modes</th>')
-            html.append('<th>Expected Failure Modes</th>')
-            html.append('<th>Unexpected Results</th>')
-            html.append('<th>Missing Results</th>')
-            html.append('</tr>')
-            
-            # Data
-            for result in results:
-                html.append('<tr>')
-                
-                # Add observation values
-                for obs in sorted(all_obs):
-                    value = "Yes" if obs in result.inputs['observations'] else "No"
-                    html.append(f'<td>{value}</td>')
-                
-                # Add sensor values
-                for sensor in sorted(all_sensors):
-                    value = result.inputs['sensor_values'].get(sensor, "Unknown")
-                    html.append(f'<td>{value}</td>')
-                
-                # Add diagnosis results
-                html.append(f'<td>{json.dumps(result.diagnosed_failure_modes)}</td>')
-                html.append(f'<td>{json.dumps(result.expected_failure_modes)}</td>')
-                
-                # Color unexpected and missing results in red
-                if result.unexpected_results:
-                    html.append(f'<td style="color:red">{json.dumps(result.unexpected_results)}</td>')
-                else:
-                    html.append('<td></td>')
-                    
-                if result.missing_results:
-                    html.append(f'<td style="color:red">{json.dumps(result.missing_results)}</td>')
-                else:
-                    html.append('<td></td>')
-                    
-                html.append('</tr>')
-                
-            html.append('</table>')
-            return '\n'.join(html)
-        
+            self._write_lines(self._html_lines(results, sorted_obs, sorted_sensors), output)
         elif format == 'table':
-            # Get all unique observation names and sensor names
-            all_obs = set()
-            all_sensors = set()
-            for result in results:
-                all_obs.update(result.inputs['observations'])
-                all_sensors.update(result.inputs['sensor_values'].keys())
-            
-            # Calculate column widths
-            col_widths = {}
-            for obs in sorted(all_obs):
-                col_widths[f"Obs: {obs}"] = max(len(f"Obs: {obs}"), 5)  # Yes/No values
-            
-            for sensor in sorted(all_sensors):
-                col_widths[f"Sensor: {sensor}"] = max(len(f"Sensor: {sensor}"), 10)  # Values may be longer
-            
-            col_widths["Diagnosed"] = 40  # For diagnosed failure modes
-            col_widths["Expected"] = 40  # For expected failure modes
-            col_widths["Unexpected"] = 40  # For unexpected results
-            col_widths["Missing"] = 40  # For missing results
-            
-            # Build the table
-            lines = []
-            
-            # Header
-            header = []
-            for obs in sorted(all_obs):
-                header.append(f"Obs: {obs}".ljust(col_widths[f"Obs: {obs}"]))
-            for sensor in sorted(all_sensors):
-                header.append(f"Sensor: {sensor}".ljust(col_widths[f"Sensor: {sensor}"]))
-            header.extend([
-                "Diagnosed".ljust(col_widths["Diagnosed"]),
-                "Expected".ljust(col_widths["Expected"]),
-                "Unexpected".ljust(col_widths["Unexpected"]),
-                "Missing".ljust(col_widths["Missing"])
-            ])
-            lines.append(" | ".join(header))
-            
-            # Separator
-            separator = []
-            for key, width in col_widths.items():
-                separator.append("-" * width)
-            lines.append("-|-".join(separator))
-            
-            # Data rows
-            for result in results:
-                row = []
-                
-                # Add observation values
-                for obs in sorted(all_obs):
-                    value = "Yes" if obs in result.inputs['observations'] else "No"
-                    row.append(value.ljust(col_widths[f"Obs: {obs}"]))
-                
-                # Add sensor values
-                for sensor in sorted(all_sensors):
-                    value = str(result.inputs['sensor_values'].get(sensor, "Unknown"))
-                    row.append(value.ljust(col_widths[f"Sensor: {sensor}"]))
-                
-                # Add diagnosis results
-                diag_str = str(result.diagnosed_failure_modes)
-                if len(diag_str) > col_widths["Diagnosed"]:
-                    diag_str = diag_str[:col_widths["Diagnosed"]-3] + "..."
-                row.append(diag_str.ljust(col_widths["Diagnosed"]))
-                
-                # Add expected results
-                exp_str = str(result.expected_failure_modes)
-                if len(exp_str) > col_widths["Expected"]:
-                    exp_str = exp_str[:col_widths["Expected"]-3] + "..."
-                row.append(exp_str.ljust(col_widths["Expected"]))
-                
-                # Add unexpected results
-                unexp_str = str(result.unexpected_results)
-                if len(unexp_str) > col_widths["Unexpected"]:
-                    unexp_str = unexp_str[:col_widths["Unexpected"]-3] + "..."
-                row.append(unexp_str.ljust(col_widths["Unexpected"]))
-                
-                # Add missing results
-                miss_str = str(result.missing_results)
-                if len(miss_str) > col_widths["Missing"]:
-                    miss_str = miss_str[:col_widths["Missing"]-3] + "..."
-                row.append(miss_str.ljust(col_widths["Missing"]))
-                
-                lines.append(" | ".join(row))
-                
-            return "\n".join(lines)
-            
+            self._write_lines(self._table_lines(results, sorted_obs, sorted_sensors), output)
         else:  # default text format
-            output = []
-            for i, result in enumerate(results):
-                output.append(f"Test Case {i+1}:")
-                output.append(f"  Observations: {', '.join(result.inputs['observations'])}")
-                output.append(f"  Sensor Values: {result.inputs['sensor_values']}")
-                output.append(f"  Diagnosed Failure Modes: {result.diagnosed_failure_modes}")
-                
-                if result.expected_failure_modes:
-                    output.append(f"  Expected Failure Modes: {result.expected_failure_modes}")
+            self._write_lines(self._text_lines(results), output)
+        
+        return "" if sink is not None else output.getvalue()
+    
+    @staticmethod
+    def _collect_schema(results: List[TruthTableResult]) -> Tuple[List[str], List[str]]:
+        """Collect the observation and sensor columns for a set of results.
+        
+        Args:
+            results: List of TruthTableResult objects.
+            
+        Returns:
+            Sorted observation names and sorted sensor names.
+        """
+        all_obs = set()
+        all_sensors = set()
+        for result in results:
+            all_obs.update(result.inputs['observations'])
+            all_sensors.update(result.inputs['sensor_values'].keys())
+        return sorted(all_obs), sorted(all_sensors)
+    
+    @staticmethod
+    def _write_lines(lines: Iterable[str], output: TextIO) -> None:
+        """Write lines to a stream with a newline between consecutive lines.
+        
+        Args:
+            lines: Lines to write.
+            output: Stream to write to.
+        """
+        separator = ""
+        for line in lines:
+            output.write(separator)
+            output.write(line)
+            separator = "\n"
+    
+    def _write_csv(self, results: List[TruthTableResult], sorted_obs: List[str],
+                   sorted_sensors: List[str], output: TextIO) -> None:
+        """Write results as CSV rows.
+        
+        Args:
+            results: List of TruthTableResult objects.
+            sorted_obs: Observation columns, from _collect_schema.
+            sorted_sensors: Sensor columns, from _collect_schema.
+            output: Stream to write to.
+        """
+        # Header, built once; rows are written by column name
+        obs_columns = [f"Obs: {obs}" for obs in sorted_obs]
+        sensor_columns = [f"Sensor: {sensor}" for sensor in sorted_sensors]
+        writer = csv.DictWriter(output, fieldnames=obs_columns + sensor_columns + [
+            'Diagnosed Failure Modes', 'Expected Failure Modes',
+            'Unexpected Results', 'Missing Results'
+        ])
+        writer.writeheader()
+        
+        # Write data; most rows repeat a few diagnosis lists, so encode each once
+        dumps_cache: Dict[tuple, str] = {}
+        obs_bits = [1 << i for i in range(len(sorted_obs))]
+        bit_by_obs = dict(zip(sorted_obs, obs_bits))
+        for result in results:
+            row = {}
+            # Look up the result's inputs once per row rather than once per cell
+            inputs = result.inputs
+            sensor_values = inputs['sensor_values']
+            
+            # Add observation values (True/False), one bit test per column
+            mask = _observation_mask(inputs['observations'], bit_by_obs)
+            for column, bit in zip(obs_columns, obs_bits):
+                row[column] = "Yes" if mask & bit else "No"
+            
+            # Add sensor values
+            for column, sensor in zip(sensor_columns, sorted_sensors):
+                row[column] = str(sensor_values.get(sensor, "Unknown"))
+            
+            # Add diagnosis results
+            row['Diagnosed Failure Modes'] = _dumps_diagnoses(result.diagnosed_pairs, dumps_cache)
+            row['Expected Failure Modes'] = _dumps_diagnoses(result.expected_pairs, dumps_cache)
+            row['Unexpected Results'] = _dumps_diagnoses(result.unexpected_pairs, dumps_cache)
+            row['Missing Results'] = _dumps_diagnoses(result.missing_pairs, dumps_cache)
+            
+            writer.writerow(row)
+    
+    def _html_lines(self, results: List[TruthTableResult], sorted_obs: List[str],
+                    sorted_sensors: List[str]) -> Iterator[str]:
+        """Generate the lines of an HTML table of results.
+        
+        Args:
+            results: List of TruthTableResult objects.
+            sorted_obs: Observation columns, from _collect_schema.
+            sorted_sensors: Sensor columns, from _collect_schema.
+            
+        Yields:
+            HTML lines.
+        """
+        yield '<table border="1">'
+        
+        # Header
+        yield '<tr>'
+        for obs in sorted_obs:
+            yield f'<th>Obs: {obs}</th>'
+        for sensor in sorted_sensors:
+            yield f'<th>Sensor: {sensor}</th>'
+        yield '<th>Diagnosed Failure Modes</th>'
+        yield '<th>Expected Failure Modes</th>'
+        yield '<th>Unexpected Results</th>'
+        yield '<th>Missing Results</th>'
+        yield '</tr>'
+        
+        # Data; most rows repeat a few diagnosis lists, so encode each once
+        dumps_cache: Dict[tuple, str] = {}
+        obs_bits = [1 << i for i in range(len(sorted_obs))]
+        bit_by_obs = dict(zip(sorted_obs, obs_bits))
+        for result in results:
+            yield '<tr>'
+            
+            # Look up the result's inputs once per row rather than once per cell
+            inputs = result.inputs
+            sensor_values = inputs['sensor_values']
+            
+            # Add observation values, one bit test per column
+            mask = _observation_mask(inputs['observations'], bit_by_obs)
+            for bit in obs_bits:
+                value = "Yes" if mask & bit else "No"
+                yield f'<td>{value}</td>'
+            
+            # Add sensor values
+            for sensor in sorted_sensors:
+                value = sensor_values.get(sensor, "Unknown")
+                yield f'<td>{value}</td>'
+            
+            # Add diagnosis results
+            yield f'<td>{_dumps_diagnoses(result.diagnosed_pairs, dumps_cache)}</td>'
+            yield f'<td>{_dumps_diagnoses(result.expected_pairs, dumps_cache)}</td>'
+            
+            # Color unexpected and missing results in red
+            if result.unexpected_pairs:
+                yield f'<td style="color:red">{_dumps_diagnoses(result.unexpected_pairs, dumps_cache)}</td>'
+            else:
+                yield '<td></td>'
                 
-                if result.unexpected_results:
-                    output.append(f"  UNEXPECTED RESULTS: {result.unexpected_results}")
+            if result.missing_pairs:
+                yield f'<td style="color:red">{_dumps_diagnoses(result.missing_pairs, dumps_cache)}</td>'
+            else:
+                yield '<td></td>'
                 
-                if result.missing_results:
-                    output.append(f"  MISSING RESULTS: {result.missing_results}")
-                    
-                output.append("")
+            yield '</tr>'
+            
+        yield '</table>'
+    
+    def _table_lines(self, results: List[TruthTableResult], sorted_obs: List[str],
+                     sorted_sensors: List[str]) -> Iterator[str]:
+        """Generate the lines of a fixed-width text table of results.
+        
+        Args:
+            results: List of TruthTableResult objects.
+            sorted_obs: Observation columns, from _collect_schema.
+            sorted_sensors: Sensor columns, from _collect_schema.
+            
+        Yields:
+            Table lines.
+        """
+        # Calculate column widths, in column order
+        obs_widths = [max(len(f"Obs: {obs}"), 5) for obs in sorted_obs]  # Yes/No values
+        sensor_widths = [max(len(f"Sensor: {sensor}"), 10) for sensor in sorted_sensors]  # Values may be longer
+        result_width = 40  # For diagnosed, expected, unexpected and missing results
+        result_columns = ["Diagnosed", "Expected", "Unexpected", "Missing"]
+        
+        # Header
+        header = []
+        for obs, width in zip(sorted_obs, obs_widths):
+            header.append(f"Obs: {obs}".ljust(width))
+        for sensor, width in zip(sorted_sensors, sensor_widths):
+            header.append(f"Sensor: {sensor}".ljust(width))
+        header.extend(column.ljust(result_width) for column in result_columns)
+        yield " | ".join(header)
+        
+        # Separator
+        widths = obs_widths + sensor_widths + [result_width] * len(result_columns)
+        yield "-|-".join("-" * width for width in widths)
+        
+        # Data rows
+        obs_bits = [1 << i for i in range(len(sorted_obs))]
+        bit_by_obs = dict(zip(sorted_obs, obs_bits))
+        for result in results:
+            row = []
+            
+            # Look up the result's inputs once per row rather than once per cell
+            inputs = result.inputs
+            sensor_values = inputs['sensor_values']
+            
+            # Add observation values, one bit test per column
+            mask = _observation_mask(inputs['observations'], bit_by_obs)
+            for bit, width in zip(obs_bits, obs_widths):
+                value = "Yes" if mask & bit else "No"
+                row.append(value.ljust(width))
+            
+            # Add sensor values
+            for sensor, width in zip(sorted_sensors, sensor_widths):
+                value = str(sensor_values.get(sensor, "Unknown"))
+                row.append(value.ljust(width))
+            
+            # Add diagnosed, expected, unexpected and missing results
+            for values in (result.diagnosed_failure_modes, result.expected_failure_modes,
+                           result.unexpected_results, result.missing_results):
+                value = str(values)
+                if len(value) > result_width:
+                    value = value[:result_width-3] + "..."
+                row.append(value.ljust(result_width))
+            
+            yield " | ".join(row)
+    
+    def _text_lines(self, results: List[TruthTableResult]) -> Iterator[str]:
+        """Generate the lines of a plain-text listing of results.
+        
+        Args:
+            results: List of TruthTableResult objects.
+            
+        Yields:
+            Text lines.
+        """
+        for i, result in enumerate(results):
+            inputs = result.inputs
+            yield f"Test Case {i+1}:"
+            yield f"  Observations: {', '.join(inputs['observations'])}"
+            yield f"  Sensor Values: {inputs['sensor_values']}"
+            yield f"  Diagnosed Failure Modes: {result.diagnosed_failure_modes}"
+            
+            if result.expected_pairs:
+                yield f"  Expected Failure Modes: {result.expected_failure_modes}"
+            
+            if result.unexpected_pairs:
+                yield f"  UNEXPECTED RESULTS: {result.unexpected_results}"
+            
+            if result.missing_pairs:
+                yield f"  MISSING RESULTS: {result.missing_results}"
                 
-            return '\n'.join(output)
+            yield ""
     
     def check_for_surprises(self, results: List[TruthTableResult]) -> bool:
         """Check if there are any unexpected or missing results.
@@ -2,34 +2,76 @@
 
 import json
 import argparse
+import logging
+import mmap
 import os
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
-from dotenv import load_dotenv
+from dotenv import dotenv_values
+from neo4j import Transaction
+from neo4j.exceptions import Neo4jError
 from rich.console import Console
 from rich.panel import Panel
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # optional speedup; fall back to the standard library
+
+try:
+    import simdjson
+except ImportError:
+    simdjson = None  # optional lazy parser; fall back to orjson or the standard library
+
+try:
+    import ijson
+except ImportError:
+    ijson = None  # optional streaming parser; fall back to loading the whole file
+
 # Telltale imports
 from telltale.core.database import Neo4jConnection # Use the connection class
-from telltale.core.node_manager import NodeManager # Use the manager class
-from telltale.core.models import (
-    Node, FailureMode, Observation, SensorReading, 
-    CausesLink, EvidenceLink, EvidenceStrength, ComparisonOperator, EvidenceProperties
-)
+from telltale.core.node_manager import NodeManager, NODE_CLASSES # Use the manager class
+from telltale.core.models import EvidenceStrength, EVIDENCE_STRENGTHS, COMPARISON_OPERATORS
 
 console = Console()
+logger = logging.getLogger(__name__)
+
+# Set once .env has been applied, so repeated setup_environment calls skip re-parsing it
+_ENV_LOADED = False
+
+# Nodes/relationships sent per bulk write; bounds the size of each query's parameters
+UPLOAD_BATCH_SIZE = 5000
+
+# Nodes deleted per transaction when clear_database can't recreate the database
+CLEAR_BATCH_SIZE = 10000
+
+# Reused across loads so its internal buffers are only allocated once
+_SIMDJSON_PARSER = simdjson.Parser() if simdjson is not None else None
 
 def setup_environment():
     """Load environment variables and verify Neo4j requirements."""
+    global _ENV_LOADED
     env_path = Path(".env")
-    if env_path.exists():
+    if _ENV_LOADED:
+        pass # .env already applied by an earlier call; don't re-read it
+    elif env_path.exists():
         # Force override of existing env vars with values from .env
-        load_dotenv(env_path, override=True) 
+        # (what load_dotenv(override=True) does, in one dict update)
+        os.environ.update({key: value for key, value in dotenv_values(env_path).items() if value is not None})
+        _ENV_LOADED = True
         console.print("[green]Loaded environment variables from .env (overriding existing)[/green]")
     else:
         console.print("[yellow]Warning: .env file not found. Relying on system environment variables.[/yellow]")
 
-    required_vars = ["NEO4J_URI", "NEO4J_USERNAME", "NEO4J_PASSWORD"]
-    missing_vars = [var for var in required_vars if not os.environ.get(var)]
+    # Read each variable once
+    env = os.environ
+    uri, username, password = env.get("NEO4J_URI"), env.get("NEO4J_USERNAME"), env.get("NEO4J_PASSWORD")
+    required_vars = {"NEO4J_URI": uri, "NEO4J_USERNAME": username, "NEO4J_PASSWORD": password}
+    missing_vars = [var for var, value in required_vars.items() if not value]
     if missing_vars:
         console.print(f"[bold red]Error: Missing required Neo4j environment variables: {', '.join(missing_vars)}[/bold red]")
         console.print("Please set NEO4J_URI, NEO4J_USERNAME, and NEO4J_PASSWORD.")
@@ -37,14 +79,10 @@ def setup_environment():
     
     console.print("[green]Neo4j environment variables found.[/green]")
     # Print the URI being used
-    console.print(f"DEBUG: Attempting to use NEO4J_URI = {os.environ.get('NEO4J_URI')}")
+    console.print(f"DEBUG: Attempting to use NEO4J_URI = {uri}")
     # Return the connection object directly
     try:
-        db = Neo4jConnection(
-            uri=os.environ["NEO4J_URI"],
-            username=os.environ["NEO4J_USERNAME"],
-            password=os.environ["NEO4J_PASSWORD"]
-        )
+        db = Neo4jConnection(uri=uri, username=username, password=password)
         db.connect() # Verify connection
         console.print("[green]Successfully connected to Neo4j.[/green]")
         return db
@@ -53,104 +91,370 @@ def setup_environment():
         raise
 
 def load_json_data(json_file_path: Path) -> dict:
-    """Load nodes and relationships from the specified JSON file."""
+    """Load nodes and relationships from the specified JSON file.
+
+    With pysimdjson installed the result is a lazy, read-only mapping: only the
+    keys upload_to_neo4j reads are ever turned into Python objects.
+    """
     if not json_file_path.exists():
         console.print(f"[bold red]Error: JSON file not found at {json_file_path}[/bold red]")
         raise FileNotFoundError(f"JSON file not found: {json_file_path}")
         
     console.print(f"Loading data from [cyan]{json_file_path}[/cyan]...")
-    with open(json_file_path, 'r', encoding='utf-8') as f:
-        try:
-            data = json.load(f)
-            console.print(f"Successfully loaded data: {len(data.get('nodes', []))} nodes, {len(data.get('relationships', []))} relationships.")
-            return data
-        except json.JSONDecodeError as e:
-            console.print(f"[bold red]Error: Failed to decode JSON from {json_file_path}[/bold red]")
-            console.print(f"Details: {e}")
-            raise
-
-def clear_database(db: Neo4jConnection):
-    """Clear the existing graph data using the connection object."""
+    try:
+        # Parse straight from a read-only memory map of the file: the C parsers
+        # take the buffer as-is, saving a file-sized bytes copy (and a text
+        # decode pass). Both copy what they need, so the map can close after.
+        with open(json_file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as buf:
+                if _SIMDJSON_PARSER is not None:
+                    data = _SIMDJSON_PARSER.parse(buf)
+                elif orjson is not None:
+                    data = orjson.loads(buf)
+                else:
+                    data = json.loads(bytes(buf)) # json only accepts bytes or str
+        console.print(f"Successfully loaded data: {len(data.get('nodes', []))} nodes, {len(data.get('relationships', []))} relationships.")
+        return data
+    except ValueError as e:
+        # json/orjson raise JSONDecodeError, simdjson a plain ValueError on bad
+        # input, and mmap a ValueError for an empty file
+        console.print(f"[bold red]Error: Failed to decode JSON from {json_file_path}[/bold red]")
+        console.print(f"Details: {e}")
+        raise
+
+def stream_json_data(json_file_path: Path) -> dict:
+    """Stream nodes and relationships from the specified JSON file with ijson.
+
+    Returns a dict shaped like load_json_data's, except that 'nodes' and
+    'relationships' are iterators that each read through the file once,
+    yielding one item at a time. Peak memory no longer grows with the file
+    size, and uploading starts before the whole file has been parsed.
+    """
+    if not json_file_path.exists():
+        console.print(f"[bold red]Error: JSON file not found at {json_file_path}[/bold red]")
+        raise FileNotFoundError(f"JSON file not found: {json_file_path}")
+
+    def _items(prefix: str):
+        with open(json_file_path, 'rb') as f:
+            # ijson picks its fastest available backend (yajl2_c when compiled)
+            yield from ijson.items(f, prefix, use_float=True)
+
+    console.print(f"Streaming data from [cyan]{json_file_path}[/cyan]...")
+    return {"nodes": _items("nodes.item"), "relationships": _items("relationships.item")}
+
+def clear_database(db: Neo4jConnection, database: Optional[str] = None):
+    """Clear the existing graph data using the connection object.
+
+    On Enterprise edition the database is dropped and recreated, which
+    discards its store files instead of deleting every node and relationship
+    one by one. That also drops all of its indexes and constraints; only the
+    name constraints from initialize_schema are restored. Elsewhere (e.g.
+    Community edition) the nodes are deleted in batches of CLEAR_BATCH_SIZE,
+    each in its own transaction, rather than in one giant one, and the schema
+    is left alone.
+
+    Args:
+        db: Connection to clear through
+        database: Name of the database to clear. If None, the user's home
+            database, which is the one the connection's sessions write to.
+    """
     console.print("[yellow]Clearing existing database...[/yellow]")
     try:
-        # Use run_query method from Neo4jConnection
-        db.run_query("MATCH (n) DETACH DELETE n") 
+        try:
+            with db.get_driver().session(database="system") as session:
+                if database is None:
+                    database = db.run_query("SHOW HOME DATABASE YIELD name", session=session)[0]["name"]
+                db.run_query(f"CREATE OR REPLACE DATABASE `{database}` WAIT", session=session)
+            console.print(f"[yellow]Recreated database '{database}'; its indexes and constraints were dropped.[/yellow]")
+            # The new database starts without constraints; restore the name
+            # constraints that back the loader's MERGEs
+            db.initialize_schema()
+        except Neo4jError as e:
+            logger.debug("Could not recreate database %s (%s); deleting nodes in batches instead.", database, e)
+            # Must run as an auto-commit query, which run_query does
+            db.run_query(
+                f"""
+                MATCH (n)
+                CALL {{ WITH n DETACH DELETE n }} IN TRANSACTIONS OF {CLEAR_BATCH_SIZE} ROWS
+                """
+            )
         console.print("[green]Database cleared.[/green]")
     except Exception as e:
         console.print(f"[bold red]Error clearing database: {e}[/bold red]")
         raise
 
-def upload_to_neo4j(node_manager: NodeManager, data: dict):
-    """Upload nodes and relationships to Neo4j using NodeManager."""
-    nodes_data = data.get('nodes', [])
-    relationships_data = data.get('relationships', [])
+def _print_issues(kind: str, issues: Counter):
+    """Print one summary line of skip/warning reasons, instead of one line per row."""
+    if issues:
+        summary = ", ".join(f"{reason}: {count}" for reason, count in issues.most_common())
+        console.print(f"[yellow]{kind.capitalize()} issues ({summary}). Run with --verbose for per-row details.[/yellow]")
 
-    if not nodes_data:
-        console.print("[yellow]No nodes found in the JSON data to upload.[/yellow]")
-        # Even if no nodes, we might have relationships if nodes already exist, so don't return yet.
-        # return
+@dataclass(frozen=True, slots=True)
+class _StagedNode:
+    """A validated JSON node waiting to be written.
 
-    console.print("Starting upload to Neo4j via NodeManager...")
+    Slotted, so each costs a fraction of a Pydantic Node (no __dict__ or
+    fields-set bookkeeping) while nodes are buffered between writes.
+    """
+    label: str
+    name: str
+    props: dict
+
+# The queries below inline labels (which can't be parameters), so there is one
+# query text per schema shape. Building each text once means every batch of that
+# shape sends byte-identical Cypher, which the server's plan cache is keyed on.
+@lru_cache(maxsize=32)
+def _node_cypher(label: str) -> str:
+    """UNWIND MERGE query for nodes with the given label."""
+    return f"""
+    UNWIND $rows AS row
+    MERGE (n:{label} {{name: row.name}})
+    SET n += row.props
+    """
+
+@lru_cache(maxsize=32)
+def _rel_cypher(source_type: str, rel_type: str, target_type: str) -> str:
+    """UNWIND MERGE query for relationships of one (source label, type, target label) shape."""
+    return f"""
+    UNWIND $rows AS row
+    MATCH (source:{source_type} {{name: row.source}})
+    MATCH (target:{target_type} {{name: row.target}})
+    MERGE (source)-[r:{rel_type}]->(target)
+    SET r = row.props
+    RETURN count(r) AS merged
+    """
+
+def _merge_nodes(node_manager: NodeManager, label: str, nodes: list, tx: Transaction) -> int:
+    """Merge one batch of nodes with the same label, keyed on name, within tx.
+
+    Like add_node with force=True there is no similarity check, which is what
+    we want for a presumably curated JSON.
+
+    Args:
+        node_manager: Manager whose connection runs the query
+        label: Node label, already validated
+        nodes: _StagedNode objects to merge
+        tx: Open transaction to write in
+
+    Returns:
+        Number of nodes merged
+    """
+    query = _node_cypher(label)
+    rows = [{"name": node.name, "props": node.props} for node in nodes]
+    try:
+        node_manager.db.run_query(query, {"rows": rows}, session=tx)
+    except Exception as e:
+        # A failed write aborts the transaction, so there is nothing to continue with
+        console.print(f"[bold red]Error adding batch of {len(nodes)} {label} nodes: {e}[/bold red]")
+        raise
+    return len(nodes)
+
+def _build_node(node_dict, issues: Counter) -> Optional[_StagedNode]:
+    """Stage one JSON node, or return None to skip it.
+
+    The reason for a skip is counted in issues and only logged per row at DEBUG.
+    """
+    node_type = node_dict.get('type')
+    node_name = node_dict.get('name')
+    node_desc = node_dict.get('description')
+
+    if not node_type or not node_name:
+        logger.debug("Skipping node due to missing type or name: %s", node_dict)
+        issues["missing type or name"] += 1
+        return None
     
-    # 1. Instantiate and Add Nodes
-    console.print(f"Processing {len(nodes_data)} nodes...")
-    added_nodes_map = {} # Map (type, name) -> Node object with ID
+    if node_type not in NODE_CLASSES:
+        logger.debug("Skipping node with unknown type '%s': %s", node_type, node_name)
+        issues["unknown type"] += 1
+        return None
+
+    # Same properties NodeManager.add_node writes
+    props = {"description": node_desc}
+    if node_type == "SensorReading":
+        unit = node_dict.get('unit') # Include unit if present
+        if unit:
+            props["unit"] = unit
+    return _StagedNode(node_type, node_name, props)
+
+def _upload_nodes(node_manager: NodeManager, nodes_data, tx: Transaction):
+    """Add the JSON nodes (a list or iterator) within tx."""
+    console.print("Processing nodes...")
     node_add_count = 0
     node_skip_count = 0
+    issues = Counter() # Skip reason -> count
+    pending = {} # Map label -> staged nodes of that label; one query shape each
     for node_dict in nodes_data:
-        node_type = node_dict.get('type')
-        node_name = node_dict.get('name')
-        node_desc = node_dict.get('description')
-
-        if not node_type or not node_name:
-            console.print(f"[yellow]Skipping node due to missing type or name: {node_dict}[/yellow]")
+        node = _build_node(node_dict, issues)
+        if node is None:
             node_skip_count += 1
             continue
-        
-        try:
-            # Instantiate Pydantic model based on type
-            if node_type == "FailureMode":
-                node_obj = FailureMode(name=node_name, description=node_desc)
-            elif node_type == "Observation":
-                node_obj = Observation(name=node_name, description=node_desc)
-            elif node_type == "SensorReading":
-                node_obj = SensorReading(
-                    name=node_name, 
-                    description=node_desc, 
-                    unit=node_dict.get('unit') # Include unit if present
-                )
-            else:
-                console.print(f"[yellow]Skipping node with unknown type '{node_type}': {node_name}[/yellow]")
-                node_skip_count += 1
-                continue
-
-            # Add node using NodeManager (handles duplicates/similarity based on its logic)
-            # We use force=True because we are loading from a presumably curated JSON,
-            # assuming we want to ensure these specific nodes exist as described.
-            # If using this script interactively, force=False might be better.
-            node_id = node_manager.add_node(node_obj, force=True) 
-            node_obj.id = node_id # Store the Neo4j ID back into the object
-            added_nodes_map[(node_type, node_name)] = node_obj
-            node_add_count += 1
-            # console.print(f"  Added/Merged Node: {node_type} '{node_name}' (ID: {node_id})")
 
-        except Exception as e:
-            console.print(f"[bold red]Error adding node '{node_name}': {e}[/bold red]")
-            # Decide whether to continue or stop on error
-            # For now, we'll skip this node and continue
+        nodes = pending.setdefault(node.label, [])
+        nodes.append(node)
+        if len(nodes) >= UPLOAD_BATCH_SIZE:
+            node_add_count += _merge_nodes(node_manager, node.label, nodes, tx)
+            del pending[node.label]
+
+    for label, nodes in pending.items():
+        node_add_count += _merge_nodes(node_manager, label, nodes, tx)
+
+    if not node_add_count and not node_skip_count:
+        console.print("[yellow]No nodes found in the JSON data to upload.[/yellow]")
+    console.print(f"[green]Processed {node_add_count} nodes successfully.[/green] Skipped {node_skip_count} nodes.")
+    _print_issues("node", issues)
+
+def _upload_nodes_by_label(node_manager: NodeManager, nodes_data, workers: int):
+    """Add the JSON nodes concurrently, one label per worker thread.
+
+    Each label's nodes are written on their own session and committed in their
+    own transaction. MERGEs on different labels never touch the same rows, and
+    the driver releases the GIL while waiting on the server.
+    """
+    console.print(f"Processing nodes with {workers} workers...")
+    buckets = {} # Map label -> staged nodes of that label
+    node_skip_count = 0
+    issues = Counter() # Skip reason -> count
+    for node_dict in nodes_data:
+        node = _build_node(node_dict, issues)
+        if node is None:
             node_skip_count += 1
             continue
-            
+        buckets.setdefault(node.label, []).append(node)
+
+    driver = node_manager.db.get_driver()
+
+    def _upload_label(label: str, nodes: list) -> int:
+        with driver.session() as session, session.begin_transaction() as tx:
+            for start in range(0, len(nodes), UPLOAD_BATCH_SIZE):
+                _merge_nodes(node_manager, label, nodes[start:start + UPLOAD_BATCH_SIZE], tx)
+            tx.commit()
+        return len(nodes)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        node_add_count = sum(executor.map(_upload_label, buckets, buckets.values()))
+
+    if not node_add_count and not node_skip_count:
+        console.print("[yellow]No nodes found in the JSON data to upload.[/yellow]")
     console.print(f"[green]Processed {node_add_count} nodes successfully.[/green] Skipped {node_skip_count} nodes.")
+    _print_issues("node", issues)
 
-    # 2. Instantiate and Add Relationships
-    if not relationships_data:
-        console.print("[yellow]No relationships found in the JSON data to upload.[/yellow]")
-        return
-        
-    console.print(f"Processing {len(relationships_data)} relationships...")
+# Node types allowed at each end of a relationship, checked against the types
+# declared in the JSON (constant-time membership, no model objects needed)
+CAUSES_SOURCE_TYPES = frozenset({"FailureMode"})
+CAUSES_TARGET_TYPES = frozenset({"Observation"})
+EVIDENCE_SOURCE_TYPES = frozenset({"Observation", "SensorReading"})
+EVIDENCE_TARGET_TYPES = frozenset({"FailureMode"})
+
+# Every valid (source type, relationship type, target type) shape. A row's shape
+# is also its group key, so one membership test validates it.
+VALID_REL_SHAPES = frozenset(
+    (source_type, rel_type, target_type)
+    for rel_type, source_types, target_types in (
+        ("CAUSES", CAUSES_SOURCE_TYPES, CAUSES_TARGET_TYPES),
+        ("EVIDENCE_FOR", EVIDENCE_SOURCE_TYPES, EVIDENCE_TARGET_TYPES),
+    )
+    for source_type in source_types
+    for target_type in target_types
+)
+
+def _build_causes(properties: dict, issues: Counter) -> dict:
+    """Build the properties for a CAUSES row (it has none)."""
+    return {}
+
+def _build_evidence(properties: dict, issues: Counter) -> dict:
+    """Build the properties for an EVIDENCE_FOR row.
+
+    Invalid enum values fall back to defaults and are counted in issues.
+    """
+    # Safely get enum values, defaulting if missing or invalid. Dict lookups
+    # avoid raising and catching ValueError on every invalid value.
+    true_str = properties.get('when_true_strength')
+    when_true = EVIDENCE_STRENGTHS.get(true_str)
+    if when_true is None:
+        if true_str is not None:
+            logger.debug("Invalid when_true_strength '%s'. Defaulting to 'suggests'.", true_str)
+            issues["invalid when_true_strength (defaulted)"] += 1
+        when_true = EvidenceStrength.SUGGESTS
+    false_str = properties.get('when_false_strength')
+    when_false = EVIDENCE_STRENGTHS.get(false_str)
+    if when_false is None:
+        if false_str is not None:
+            logger.debug("Invalid when_false_strength '%s'. Defaulting to 'inconclusive'.", false_str)
+            issues["invalid when_false_strength (defaulted)"] += 1
+        when_false = EvidenceStrength.INCONCLUSIVE
+    
+    op_str = properties.get('operator')
+    operator = None
+    if op_str:
+        operator = COMPARISON_OPERATORS.get(op_str)
+        if operator is None:
+            logger.debug("Invalid operator '%s'. Setting to None.", op_str)
+            issues["invalid operator (dropped)"] += 1
+
+    # Validation would coerce numeric thresholds to float; do the same here
+    threshold = properties.get('threshold')
+    if isinstance(threshold, (int, float)) and not isinstance(threshold, bool):
+        threshold = float(threshold)
+
+    # Same properties EvidenceLink.cypher_properties() stores: enum values as
+    # strings, unset fields left out
+    evidence_props = {
+        "when_true_strength": when_true.value,
+        "when_false_strength": when_false.value,
+        "operator": operator.value if operator is not None else None,
+        "threshold": threshold,
+        "when_true_rationale": properties.get('when_true_rationale'),
+        "when_false_rationale": properties.get('when_false_rationale'),
+    }
+    return {key: value for key, value in evidence_props.items() if value is not None}
+
+# Relationship type -> properties builder, replacing a per-row if/elif chain on the type string
+REL_BUILDERS = {
+    "CAUSES": _build_causes,
+    "EVIDENCE_FOR": _build_evidence,
+}
+
+def _merge_relationships(node_manager: NodeManager, group: tuple, rows: list, tx: Transaction) -> int:
+    """Merge one batch of relationships that share endpoint labels and type, within tx.
+
+    Both endpoints are found by label and name in the same query, so no node
+    IDs are needed; rows whose endpoints don't exist simply don't match.
+
+    Args:
+        node_manager: Manager whose connection runs the query
+        group: (source label, relationship type, target label), all validated
+        rows: Dicts with 'source' and 'target' names and the relationship 'props'
+        tx: Open transaction to write in
+
+    Returns:
+        Number of relationships merged
+    """
+    query = _rel_cypher(*group)
+    rel_type = group[1]
+    try:
+        result = node_manager.db.run_query(query, {"rows": rows}, session=tx)
+    except Exception as e:
+        console.print(f"[bold red]Error adding batch of {len(rows)} {rel_type} relationships: {e}[/bold red]")
+        raise
+    return result[0]["merged"]
+
+def _upload_relationships(node_manager: NodeManager, relationships_data, tx: Transaction):
+    """Add the JSON relationships (a list or iterator) between existing nodes within tx."""
+    console.print("Processing relationships...")
     rel_add_count = 0
     rel_skip_count = 0
+    issues = Counter() # Skip/warning reason -> count
+    # Map (source type, rel type, target type) -> pending rows; one query shape each
+    groups: Dict[Tuple[str, str, str], List[dict]] = defaultdict(list)
+
+    def _flush(group: tuple, rows: list):
+        nonlocal rel_add_count, rel_skip_count
+        merged = _merge_relationships(node_manager, group, rows, tx)
+        rel_add_count += merged
+        if merged < len(rows):
+            rel_skip_count += len(rows) - merged
+            issues["endpoint node not found"] += len(rows) - merged
+
     for rel_dict in relationships_data:
         rel_type = rel_dict.get('type')
         source_info = rel_dict.get('source')
@@ -158,7 +462,8 @@ def upload_to_neo4j(node_manager: NodeManager, data: dict):
         properties = rel_dict.get('properties', {}) # Get properties dict
 
         if not rel_type or not source_info or not target_info:
-            console.print(f"[yellow]Skipping relationship due to missing type, source, or target: {rel_dict}[/yellow]")
+            logger.debug("Skipping relationship due to missing type, source, or target: %s", rel_dict)
+            issues["missing type, source, or target"] += 1
             rel_skip_count += 1
             continue
             
@@ -166,91 +471,74 @@ def upload_to_neo4j(node_manager: NodeManager, data: dict):
         source_name = source_info.get('name')
         target_type = target_info.get('type')
         target_name = target_info.get('name')
-
-        # Find the source and target node objects we added earlier
-        source_node = added_nodes_map.get((source_type, source_name))
-        target_node = added_nodes_map.get((target_type, target_name))
-
-        # If nodes weren't successfully added/found, skip relationship
-        if not source_node:
-            console.print(f"[yellow]Skipping relationship: Source node '{source_name}' ({source_type}) not found or failed to add.[/yellow]")
+             
+        group = (source_type, rel_type, target_type)
+        if group not in VALID_REL_SHAPES:
+            if rel_type in REL_BUILDERS:
+                logger.debug("Skipping %s relationship: Invalid node types %s -> %s", rel_type, source_type, target_type)
+                issues[f"invalid {rel_type} node types"] += 1
+            else:
+                logger.debug("Skipping relationship with unknown type '%s'.", rel_type)
+                issues["unknown type"] += 1
             rel_skip_count += 1
             continue
-        if not target_node:
-             console.print(f"[yellow]Skipping relationship: Target node '{target_name}' ({target_type}) not found or failed to add.[/yellow]")
-             rel_skip_count += 1
-             continue
-             
+
         try:
-            # Instantiate Relationship Pydantic model
-            if rel_type == "CAUSES":
-                # Ensure source is FailureMode and target is Observation
-                if not isinstance(source_node, FailureMode) or not isinstance(target_node, Observation):
-                    console.print(f"[yellow]Skipping CAUSES relationship: Invalid node types {source_node.__class__.__name__} -> {target_node.__class__.__name__}[/yellow]")
-                    rel_skip_count += 1
-                    continue
-                rel_obj = CausesLink(source=source_node, target=target_node)
-
-            elif rel_type == "EVIDENCE_FOR":
-                 # Ensure source is Observation/SensorReading and target is FailureMode
-                if not isinstance(target_node, FailureMode) or not isinstance(source_node, (Observation, SensorReading)):
-                    console.print(f"[yellow]Skipping EVIDENCE_FOR relationship: Invalid node types {source_node.__class__.__name__} -> {target_node.__class__.__name__}[/yellow]")
-                    rel_skip_count += 1
-                    continue
-                
-                # Safely get enum values, defaulting if necessary or invalid
-                try:
-                    when_true = EvidenceStrength(properties.get('when_true_strength', 'suggests'))
-                except ValueError:
-                    console.print(f"[yellow]Warning: Invalid when_true_strength '{properties.get('when_true_strength')}' for {source_name}->{target_name}. Defaulting to 'suggests'.[/yellow]")
-                    when_true = EvidenceStrength.SUGGESTS
-                try:
-                    when_false = EvidenceStrength(properties.get('when_false_strength', 'inconclusive'))
-                except ValueError:
-                    console.print(f"[yellow]Warning: Invalid when_false_strength '{properties.get('when_false_strength')}' for {source_name}->{target_name}. Defaulting to 'inconclusive'.[/yellow]")
-                    when_false = EvidenceStrength.INCONCLUSIVE
-                
-                op_str = properties.get('operator')
-                operator = None
-                if op_str:
-                    try:
-                        operator = ComparisonOperator(op_str)
-                    except ValueError:
-                         console.print(f"[yellow]Warning: Invalid operator '{op_str}' for {source_name}->{target_name}. Setting to None.[/yellow]")
-
-                # Create EvidenceProperties object first
-                evidence_props_data = EvidenceProperties(
-                    when_true_strength=when_true,
-                    when_false_strength=when_false,
-                    when_true_rationale=properties.get('when_true_rationale'),
-                    when_false_rationale=properties.get('when_false_rationale'),
-                    operator=operator, 
-                    threshold=properties.get('threshold')
-                )
-                
-                # Instantiate EvidenceLink with nested properties
-                rel_obj = EvidenceLink(
-                    source=source_node, 
-                    target=target_node,
-                    properties=evidence_props_data # Assign the nested object
-                )
-            else:
-                console.print(f"[yellow]Skipping relationship with unknown type '{rel_type}'.[/yellow]")
-                rel_skip_count += 1
-                continue
-
-            # Add relationship using NodeManager
-            rel_id = node_manager.add_relationship(rel_obj)
-            rel_add_count += 1
-            # console.print(f"  Added Relationship: ({source_name})-[{rel_type}]->({target_name}) (ID: {rel_id})")
-        
+            # Build the relationship's properties
+            props = REL_BUILDERS[rel_type](properties, issues)
         except Exception as e:
-            console.print(f"[bold red]Error adding relationship {source_name}-[{rel_type}]->{target_name}: {e}[/bold red]")
+            logger.debug("Error adding relationship %s-[%s]->%s: %s", source_name, rel_type, target_name, e)
+            issues["invalid relationship"] += 1
             # Decide whether to continue or stop on error
             rel_skip_count += 1
             continue
 
+        rows = groups[group]
+        rows.append({"source": source_name, "target": target_name, "props": props})
+        if len(rows) >= UPLOAD_BATCH_SIZE:
+            _flush(group, rows)
+            del groups[group]
+
+    for group, rows in groups.items():
+        _flush(group, rows)
+
+    if not rel_add_count and not rel_skip_count:
+        console.print("[yellow]No relationships found in the JSON data to upload.[/yellow]")
     console.print(f"[green]Processed {rel_add_count} relationships successfully.[/green] Skipped {rel_skip_count} relationships.")
+    _print_issues("relationship", issues)
+
+
+def upload_to_neo4j(node_manager: NodeManager, data: dict, workers: int = 1):
+    """Upload nodes and relationships to Neo4j using NodeManager.
+
+    Everything is written in one explicit transaction, so the load commits
+    once at the end and any failed write rolls the whole load back. The
+    'nodes' and 'relationships' entries may be lists or iterators (see
+    stream_json_data); either is consumed in a single pass.
+
+    With workers > 1, nodes are instead written per label in parallel, each
+    label in its own transaction (see _upload_nodes_by_label), and the
+    relationships follow in a final transaction once every node exists.
+    A failure then only rolls back the transaction it happened in.
+    """
+    nodes_data = data.get('nodes', [])
+    relationships_data = data.get('relationships', [])
+
+    console.print("Starting upload to Neo4j via NodeManager...")
+
+    if workers > 1:
+        # 1. Instantiate and Add Nodes, one label per worker
+        _upload_nodes_by_label(node_manager, nodes_data, workers)
+    
+    with node_manager.db.get_driver().session() as session, session.begin_transaction() as tx:
+        # 1. Instantiate and Add Nodes
+        if workers <= 1:
+            _upload_nodes(node_manager, nodes_data, tx)
+
+        # 2. Instantiate and Add Relationships
+        _upload_relationships(node_manager, relationships_data, tx)
+
+        tx.commit()
 
 
 def main():
@@ -267,7 +555,22 @@ def main():
         action="store_true",
         help="Clear the Neo4j database before loading new data."
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Upload each node label on its own thread, using up to this many (default: 1)."
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Log the reason for every skipped row or defaulted value."
+    )
     args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    if args.verbose:
+        # Only this script's per-row details, not the driver's debug output
+        logger.setLevel(logging.DEBUG)
 
     json_file_path = Path(args.json_file)
     
@@ -278,8 +581,11 @@ def main():
         # 1. Setup Environment & Get DB Connection
         db_connection = setup_environment()
         
-        # 2. Load Data from JSON
-        data = load_json_data(json_file_path)
+        # 2. Load Data from JSON, streaming it when ijson is installed
+        if ijson is not None:
+            data = stream_json_data(json_file_path)
+        else:
+            data = load_json_data(json_file_path)
         
         # 3. Initialize NodeManager
         console.print("Initializing NodeManager...")
@@ -297,7 +603,7 @@ def main():
             console.print("[green]NodeManager re-initialized.[/green]")
 
         # 5. Upload Data using NodeManager
-        upload_to_neo4j(node_manager, data)
+        upload_to_neo4j(node_manager, data, workers=args.workers)
         
         console.print(Panel("[bold green]Upload process completed successfully![/bold green]", border_style="green"))
 
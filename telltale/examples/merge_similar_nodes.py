@@ -8,19 +8,35 @@ import json
 import argparse
 import os
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
 from dotenv import load_dotenv
 from rich.console import Console
 from rich.panel import Panel
 from rich.logging import RichHandler
-import re # Add import for regex
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # optional speedup; fall back to the standard library
+
+try:
+    import ijson
+except ImportError:
+    ijson = None  # optional streaming parser; fall back to loading the whole file
 
 # Telltale imports
 from telltale.core.database import Neo4jConnection
 from telltale.core.node_manager import NodeManager, NodeType
+from telltale.core.semantic_search import SearchResult
 from telltale.core.models import (
     FailureMode, Observation, SensorReading,
-    CausesLink, EvidenceLink, EvidenceStrength, ComparisonOperator, EvidenceProperties
+    CausesLink, EvidenceLink, EvidenceStrength, EvidenceProperties,
+    EVIDENCE_STRENGTHS, COMPARISON_OPERATORS
 )
 
 # --- Configuration ---
@@ -71,14 +87,35 @@ def load_json_data(json_file_path: Path) -> dict:
         raise FileNotFoundError(f"JSON file not found: {json_file_path}")
 
     logger.info(f"Loading data from [cyan]{json_file_path}[/cyan]...")
-    with open(json_file_path, 'r', encoding='utf-8') as f:
-        try:
-            data = json.load(f)
-            logger.info(f"Successfully loaded data: {len(data.get('nodes', []))} nodes, {len(data.get('relationships', []))} relationships.")
-            return data
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to decode JSON from {json_file_path}: {e}", exc_info=True)
-            raise
+    try:
+        if orjson is not None:
+            data = orjson.loads(json_file_path.read_bytes())
+        else:
+            with open(json_file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        logger.info(f"Successfully loaded data: {len(data.get('nodes', []))} nodes, {len(data.get('relationships', []))} relationships.")
+        return data
+    except json.JSONDecodeError as e: # orjson.JSONDecodeError is a subclass
+        logger.error(f"Failed to decode JSON from {json_file_path}: {e}", exc_info=True)
+        raise
+
+def stream_json_data(json_file_path: Path) -> dict:
+    """Stream nodes and relationships from the specified JSON file with ijson.
+
+    Returns a dict shaped like load_json_data's, except that 'nodes' and
+    'relationships' are iterators that each read through the file once, so
+    nodes are instantiated while the file is still being parsed.
+    """
+    if not json_file_path.exists():
+        logger.error(f"JSON file not found at {json_file_path}")
+        raise FileNotFoundError(f"JSON file not found: {json_file_path}")
+
+    def _items(prefix: str):
+        with open(json_file_path, 'rb') as f:
+            yield from ijson.items(f, prefix, use_float=True)
+
+    logger.info(f"Streaming data from [cyan]{json_file_path}[/cyan]...")
+    return {"nodes": _items("nodes.item"), "relationships": _items("relationships.item")}
 
 def clear_database(db: Neo4jConnection):
     """Clear the existing graph data."""
@@ -153,25 +190,22 @@ def instantiate_relationship(rel_dict: dict, node_map: dict):
             # Type checks can be added here if needed
             return CausesLink(source=source_node, target=target_node)
         elif rel_type == "EVIDENCE_FOR":
-            # Safely get enum values
-            try:
-                when_true = EvidenceStrength(properties.get('when_true_strength', 'suggests'))
-            except ValueError:
+            # Plain dict lookups (built once in models) instead of Enum calls that raise on bad input
+            when_true = EVIDENCE_STRENGTHS.get(properties.get('when_true_strength', 'suggests'))
+            if when_true is None:
                 logger.warning(f"Invalid when_true_strength '{properties.get('when_true_strength')}' for {source_name}->{target_name}. Defaulting to 'suggests'.")
                 when_true = EvidenceStrength.SUGGESTS
-            try:
-                when_false = EvidenceStrength(properties.get('when_false_strength', 'inconclusive'))
-            except ValueError:
+            when_false = EVIDENCE_STRENGTHS.get(properties.get('when_false_strength', 'inconclusive'))
+            if when_false is None:
                 logger.warning(f"Invalid when_false_strength '{properties.get('when_false_strength')}' for {source_name}->{target_name}. Defaulting to 'inconclusive'.")
                 when_false = EvidenceStrength.INCONCLUSIVE
 
             op_str = properties.get('operator')
             operator = None
             if op_str:
-                try:
-                    operator = ComparisonOperator(op_str)
-                except ValueError:
-                     logger.warning(f"Invalid operator '{op_str}' for {source_name}->{target_name}. Setting to None.")
+                operator = COMPARISON_OPERATORS.get(op_str)
+                if operator is None:
+                    logger.warning(f"Invalid operator '{op_str}' for {source_name}->{target_name}. Setting to None.")
 
             evidence_props = EvidenceProperties(
                 when_true_strength=when_true,
@@ -190,123 +224,202 @@ def instantiate_relationship(rel_dict: dict, node_map: dict):
         return None
 
 
-def process_json_file(node_manager: NodeManager, file_path: Path, node_map: dict):
-    """Loads data from a JSON file and adds nodes/relationships via NodeManager, handling similarities."""
-    data = load_json_data(file_path)
-    nodes_data = data.get('nodes', [])
-    relationships_data = data.get('relationships', [])
+def find_similar_matches(node_manager: NodeManager, nodes: list, embeddings: Optional[np.ndarray]) -> list:
+    """Finds, for each node, its closest match among existing nodes and earlier new nodes.
+
+    The nodes are looked up in one index search, and scored against each other with a
+    single matrix product, so a node is also merged into an earlier node of the same
+    batch (which add_node would have indexed by then).
+
+    Args:
+        node_manager: NodeManager whose vector index and similarity threshold are used
+        nodes: Nodes in processing order
+        embeddings: The nodes' embeddings from NodeVectorIndex.embed_nodes, or None if
+            there is no vector index
+
+    Returns:
+        One entry per node: None if nothing reaches the similarity threshold, otherwise
+        (score, match) where match is a SearchResult for an existing node or the earlier
+        node in `nodes` that will be created
+    """
+    vector_index = node_manager.vector_index
+    if not vector_index or embeddings is None:
+        return [None] * len(nodes)
+
+    existing_matches = vector_index.search_embeddings(embeddings, k=1)
+    batch_scores = vector_index.pairwise_scores(embeddings)
+
+    matches = []
+    accepted = [] # Rows of nodes that will be created, which later nodes can match
+    for row, existing in enumerate(existing_matches):
+        best = (existing[0].score, existing[0]) if existing else None
+        if accepted:
+            scores = batch_scores[row, accepted]
+            col = int(scores.argmax())
+            if best is None or scores[col] > best[0]:
+                best = (float(scores[col]), nodes[accepted[col]])
+
+        if best is not None and best[0] >= node_manager.similarity_threshold:
+            matches.append(best)
+        else:
+            matches.append(None)
+            accepted.append(row)
+    return matches
 
-    logger.info(f"--- Processing Nodes from {file_path.name} ---")
-    node_add_count = 0
-    node_similar_count = 0
-    node_fail_count = 0
-    skipped_similar_nodes = [] # Track skipped nodes and their matches
 
-    current_file_node_map = {} # Track nodes from *this* file before merging with main map
+@dataclass
+class EmbeddedFile:
+    """Nodes instantiated and embedded from one JSON file, ready to be written."""
+    file_path: Path
+    nodes: dict # (type, name) -> node, first copy of each in file order
+    embeddings: Optional[np.ndarray] # One row per node, or None without a vector index
+    relationships: Iterable[dict]
+    node_fail_count: int
+
 
-    for node_dict in nodes_data:
+def embed_phase(node_manager: NodeManager, file_path: Path) -> EmbeddedFile:
+    """Loads a JSON file, instantiates its nodes and embeds them in one batch.
+
+    Nothing is read from or written to the database, so this can run for several
+    files at once in worker threads.
+    """
+    # Nodes and relationships are each read in a single pass, so they can be streamed
+    data = stream_json_data(file_path) if ijson is not None else load_json_data(file_path)
+
+    # Instantiate every node; repeats within this file link to the first copy
+    node_fail_count = 0
+    file_nodes = {}
+    for node_dict in data.get('nodes', []):
         node_obj = instantiate_node(node_dict)
         if not node_obj:
             node_fail_count += 1
             continue
+        file_nodes.setdefault((node_obj.type, node_obj.name), node_obj)
 
-        node_key = (node_obj.type, node_obj.name)
-
-        try:
-            # Attempt to add the node. force=False enables similarity check.
-            node_id = node_manager.add_node(node_obj, force=False)
-            node_obj.id = node_id # Update object with Neo4j ID
-            logger.info(f"  Added Node: [cyan]{node_obj.type}[/cyan] '[green]{node_obj.name}[/green]' (ID: {node_id})")
-            node_add_count += 1
-            current_file_node_map[node_key] = node_obj # Add successfully added node
-            node_map[node_key] = node_obj # Add to master map
-
-        except ValueError as e:
-            # ValueError signals a similar node was found
-            warning_msg = f"  Skipped Node: [cyan]{node_obj.type}[/cyan] '[yellow]{node_obj.name}[/yellow]' - Similar node detected: {e}"
-            logger.warning(warning_msg)
-            node_similar_count += 1
-            
-            # Try to parse the existing node name from the exception message
-            match = re.search(r"Similar node exists: (.*) \(similarity:", str(e))
-            existing_node_name = match.group(1).strip() if match else "Unknown"
-            skipped_similar_nodes.append({
-                "skipped": node_obj.name,
-                "type": node_obj.type,
-                "existing": existing_node_name
-            })
-
-            # Find the existing node in the master map to use its ID
-            # ... (rest of the existing logic in the except block to find existing_node and assign ID)
-            existing_node = None
-            # Quick check if the exact key exists (e.g., if node reappears in the same file)
-            if node_key in node_map:
-                 existing_node = node_map[node_key]
-            else:
-                # If not exact match, perform a find_similar_nodes call to get the ID of the best match
-                # This adds an extra call but ensures we link relationships correctly.
-                try:
-                    similar_nodes = node_manager.find_similar_nodes(node_obj)
-                    if similar_nodes and similar_nodes[0].score >= node_manager.similarity_threshold:
-                        # Find the node object corresponding to this ID in our master map
-                        for key, node in node_map.items():
-                            if node.id == similar_nodes[0].id:
-                                existing_node = node
-                                break
-                        if not existing_node:
-                             logger.error(f"    Could not find existing node with ID {similar_nodes[0].id} in node_map despite similarity match!")
-                    else:
-                         logger.error(f"    Similarity error: ValueError raised, but find_similar_nodes did not return a match above threshold for {node_obj.name}. Exception: {e}")
-
-                except Exception as find_err:
-                     logger.error(f"    Error calling find_similar_nodes for {node_obj.name} after ValueError: {find_err}", exc_info=True)
-
-
-            if existing_node and existing_node.id:
-                node_obj.id = existing_node.id # Point the current object to the existing node's ID
-                current_file_node_map[node_key] = node_obj # Add to this file's map for relationship linking
-                logger.info(f"    Using existing node ID: {existing_node.id} for relationships.")
-            else:
-                logger.error(f"    Failed to find existing node ID for '{node_obj.name}'. Relationships involving this node may fail.")
-                node_fail_count +=1
+    embeddings = None
+    if node_manager.vector_index and file_nodes:
+        embeddings = node_manager.vector_index.embed_nodes(list(file_nodes.values()))
+
+    return EmbeddedFile(file_path, file_nodes, embeddings, data.get('relationships', []), node_fail_count)
 
-        except Exception as e:
-            logger.error(f"  Failed Node: [cyan]{node_obj.type}[/cyan] '[red]{node_obj.name}[/red]' - Error: {e}", exc_info=True)
-            node_fail_count += 1
 
-    logger.info(f"[green]{node_add_count} nodes added[/green], [yellow]{node_similar_count} similar nodes skipped[/yellow], [red]{node_fail_count} nodes failed[/red].")
+def write_phase(node_manager: NodeManager, embedded: EmbeddedFile, node_map: dict, id_to_node: dict):
+    """Adds one embedded file's nodes/relationships via NodeManager, handling similarities.
 
-    # Report skipped nodes if any
-    if skipped_similar_nodes:
-        console.print(f"[bold yellow]Overlap Report for {file_path.name}:[/bold yellow]")
-        for item in skipped_similar_nodes:
-            console.print(f"  - Skipped '{item['skipped']}' ({item['type']}) -> Matched existing '{item['existing']}'")
+    Similarity checks run client-side against the vector index; the new nodes and all
+    relationships are then written in one transaction, one UNWIND MERGE per label and
+    relationship type. Files must be written one at a time, since each one's nodes are
+    matched against those written before it.
 
-    # Update the master map with nodes processed from this file (including those pointing to existing IDs)
-    node_map.update(current_file_node_map)
+    Relationships whose endpoint ID no longer matches a node are counted as failed and
+    left out; any other write error rolls back the whole file and is raised.
 
-    logger.info(f"--- Processing Relationships from {file_path.name} ---")
-    rel_add_count = 0
-    rel_skip_count = 0
-    rel_fail_count = 0
+    node_map ((type, name) -> node) and id_to_node (Neo4j ID -> first node seen with
+    that ID) are updated in place together.
+    """
+    file_path = embedded.file_path
+    file_nodes = embedded.nodes
+    relationships_data = embedded.relationships
 
-    for rel_dict in relationships_data:
-        # Use the potentially updated master node_map which contains correct IDs
-        rel_obj = instantiate_relationship(rel_dict, node_map)
+    logger.info(f"--- Processing Nodes from {file_path.name} ---")
+    node_similar_count = 0
+    node_fail_count = embedded.node_fail_count
+    skipped_similar_nodes = [] # Track skipped nodes and their matches
 
-        if not rel_obj:
-            rel_skip_count += 1
+    current_file_node_map = {} # Track nodes from *this* file before merging with main map
+    new_nodes = {} # Nodes to create, keyed by (type, name) in file order
+    new_rows = [] # Row of each new node in embedded.embeddings
+
+    # Decide which nodes are new from one batched similarity computation
+    matches = find_similar_matches(node_manager, list(file_nodes.values()), embedded.embeddings)
+    for row, ((node_key, node_obj), match) in enumerate(zip(file_nodes.items(), matches)):
+        if match is None:
+            new_nodes[node_key] = node_obj
+            new_rows.append(row)
             continue
 
-        try:
-            rel_id = node_manager.add_relationship(rel_obj)
-            rel_add_count += 1
-            # logger.info(f"  Added Relationship: ({rel_obj.source.name})-[{rel_obj.type}]->({rel_obj.target.name}) (ID: {rel_id})")
-        except Exception as e:
-            logger.error(f"  Failed Relationship: ({rel_obj.source.name})-[{rel_obj.type}]->({rel_obj.target.name}) - Error: {e}", exc_info=True)
-            rel_fail_count += 1
+        score, existing = match
+        logger.warning(f"  Skipped Node: [cyan]{node_obj.type}[/cyan] '[yellow]{node_obj.name}[/yellow]' - Similar node detected: {existing.name} (similarity: {score:.2f})")
+        node_similar_count += 1
+        skipped_similar_nodes.append({
+            "skipped": node_obj.name,
+            "type": node_obj.type,
+            "existing": existing.name
+        })
+
+        if not isinstance(existing, SearchResult):
+            # Matched a new node from this file; relationships link to it once it is written
+            current_file_node_map[node_key] = existing
+            logger.info(f"    Using node '{existing.name}' from this file for relationships.")
+            continue
 
-    logger.info(f"[green]{rel_add_count} relationships added[/green], [yellow]{rel_skip_count} relationships skipped[/yellow], [red]{rel_fail_count} relationships failed[/red].")
+        # Find the existing node in the master map to use its ID
+        existing_node = None
+        # Quick check if the exact key exists (e.g., if node reappears in a later file)
+        if node_key in node_map:
+             existing_node = node_map[node_key]
+        else:
+            # Find the node object corresponding to the match's ID in our master map
+            existing_node = id_to_node.get(existing.id)
+            if not existing_node:
+                 logger.error(f"    Could not find existing node with ID {existing.id} in node_map despite similarity match!")
+
+        if existing_node and existing_node.id:
+            node_obj.id = existing_node.id # Point the current object to the existing node's ID
+            current_file_node_map[node_key] = node_obj # Add to this file's map for relationship linking
+            logger.info(f"    Using existing node ID: {existing_node.id} for relationships.")
+        else:
+            logger.error(f"    Failed to find existing node ID for '{node_obj.name}'. Relationships involving this node may fail.")
+            node_fail_count +=1
+
+    # Pass 2: write the file in one transaction; a failure rolls the whole file back
+    with node_manager.db.get_driver().session() as session, session.begin_transaction() as tx:
+        node_manager.add_nodes_bulk(list(new_nodes.values()), tx=tx)
+        for node_obj in new_nodes.values():
+            logger.info(f"  Added Node: [cyan]{node_obj.type}[/cyan] '[green]{node_obj.name}[/green]' (ID: {node_obj.id})")
+        current_file_node_map.update(new_nodes)
+
+        logger.info(f"[green]{len(new_nodes)} nodes added[/green], [yellow]{node_similar_count} similar nodes skipped[/yellow], [red]{node_fail_count} nodes failed[/red].")
+
+        # Report skipped nodes if any
+        if skipped_similar_nodes:
+            console.print(f"[bold yellow]Overlap Report for {file_path.name}:[/bold yellow]")
+            for item in skipped_similar_nodes:
+                console.print(f"  - Skipped '{item['skipped']}' ({item['type']}) -> Matched existing '{item['existing']}'")
+
+        # Update the master map with nodes processed from this file (including those pointing to existing IDs)
+        node_map.update(current_file_node_map)
+        for node_obj in current_file_node_map.values():
+            if node_obj.id:
+                id_to_node.setdefault(node_obj.id, node_obj)
+
+        logger.info(f"--- Processing Relationships from {file_path.name} ---")
+        rel_objs = []
+        rel_skip_count = 0
+        rel_fail_count = 0
+
+        for rel_dict in relationships_data:
+            # Use the potentially updated master node_map which contains correct IDs
+            rel_obj = instantiate_relationship(rel_dict, node_map)
+
+            if not rel_obj:
+                rel_skip_count += 1
+                continue
+            rel_objs.append(rel_obj)
+
+        # A stale endpoint ID fails only its own relationship, not the whole file
+        rel_ids = node_manager.add_relationships_bulk(rel_objs, tx=tx, skip_unmatched=True)
+        for rel_obj, rel_id in zip(rel_objs, rel_ids):
+            if rel_id is None:
+                logger.error(f"  Failed Relationship: ({rel_obj.source.name})-[{rel_obj.type}]->({rel_obj.target.name}) - Error: source or target node not found")
+                rel_fail_count += 1
+        tx.commit()
+
+    # Only index the new nodes once they are committed, reusing their embeddings
+    new_embeddings = embedded.embeddings[new_rows] if embedded.embeddings is not None else None
+    node_manager.index_nodes(list(new_nodes.values()), new_embeddings)
+
+    logger.info(f"[green]{len(rel_objs) - rel_fail_count} relationships added[/green], [yellow]{rel_skip_count} relationships skipped[/yellow], [red]{rel_fail_count} relationships failed[/red].")
 
     return node_map
 
@@ -330,6 +443,12 @@ def main():
         default=0.8,
         help="Similarity threshold for merging nodes (0.0 to 1.0)."
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="Number of files to load and embed concurrently."
+    )
     args = parser.parse_args()
 
     console.print(Panel(f"Starting Merge Example Script for: [cyan]{', '.join(args.json_files)}[/cyan] (Threshold: {args.threshold})", title="Node Merge Demo", border_style="blue"))
@@ -344,6 +463,8 @@ def main():
         logger.info(f"Initializing NodeManager (Similarity Threshold: {args.threshold})...")
         # IMPORTANT: initialize_vector_index=True loads existing nodes for comparison
         node_manager = NodeManager(db=db_connection, similarity_threshold=args.threshold, initialize_vector_index=True)
+        # Merging relies on similarity checks, so wait for the index to finish building
+        node_manager.wait_for_vector_index()
         logger.info("[green]NodeManager initialized.[/green]")
 
         # 3. Clear database if requested
@@ -359,15 +480,23 @@ def main():
             logger.info("[green]NodeManager re-initialized.[/green]")
 
 
-        # 4. Process each JSON file sequentially
-        master_node_map = {} # Keep track of all nodes added or mapped across files
+        # 4. Embed the files concurrently, then write them one at a time in the given order
+        file_paths = []
         for file_str in args.json_files:
             json_file_path = Path(file_str)
             if not json_file_path.exists():
                  logger.error(f"Input file not found: {json_file_path}. Skipping.")
                  continue
-            master_node_map = process_json_file(node_manager, json_file_path, master_node_map)
-            logger.info("-" * 20) # Separator between files
+            file_paths.append(json_file_path)
+
+        master_node_map = {} # Keep track of all nodes added or mapped across files
+        master_id_to_node = {} # Index of master_node_map by Neo4j ID
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            # Encoding releases the GIL, so threads embed files in parallel
+            futures = [executor.submit(embed_phase, node_manager, path) for path in file_paths]
+            for future in futures:
+                master_node_map = write_phase(node_manager, future.result(), master_node_map, master_id_to_node)
+                logger.info("-" * 20) # Separator between files
 
 
         console.print(Panel("[bold green]Processing completed successfully![/bold green]", border_style="green"))
@@ -379,6 +508,8 @@ def main():
         logger.error(f"An unexpected error occurred: {e}", exc_info=True)
         console.print(Panel("[bold red]An unexpected error occurred.[/bold red]", border_style="red"))
     finally:
+        if node_manager:
+            node_manager.close()
         if db_connection:
             db_connection.close()
             logger.info("Neo4j connection closed.")
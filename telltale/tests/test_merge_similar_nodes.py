@@ -0,0 +1,77 @@
+"""Tests for the similarity matching in the merge_similar_nodes example."""
+
+import unittest
+from unittest.mock import Mock
+
+import numpy as np
+
+from telltale.core.models import Observation
+from telltale.core.semantic_search import SearchResult
+from telltale.examples.merge_similar_nodes import find_similar_matches
+
+
+class FindSimilarMatchesTest(unittest.TestCase):
+    """Test cases for find_similar_matches."""
+
+    def setUp(self):
+        """Set up a node manager stub over a stub vector index."""
+        self.existing = SearchResult(id="obs-1", name="No Music", type="Observation", score=0.9)
+        self.nodes = [
+            Observation(name="No Music Playing"),
+            Observation(name="Low Battery"),
+            Observation(name="Battery Low"),
+        ]
+        # Rows 1 and 2 score 0.95 against each other
+        self.embeddings = np.array([
+            [1.0, 0.0, 0.0],
+            [0.0, 1.0, 0.0],
+            [0.0, 0.95, np.sqrt(1 - 0.95 ** 2)],
+        ], dtype=np.float32)
+
+        vector_index = Mock()
+        vector_index.search_embeddings.return_value = [
+            [self.existing],
+            [SearchResult(id="obs-2", name="Loud Hum", type="Observation", score=0.3)],
+            [SearchResult(id="obs-2", name="Loud Hum", type="Observation", score=0.5)],
+        ]
+        vector_index.pairwise_scores.side_effect = lambda e: np.matmul(e, e.T)
+
+        self.node_manager = Mock(vector_index=vector_index, similarity_threshold=0.8)
+
+    def test_matches(self):
+        """Test matching an existing node, a below-threshold node and an earlier new node."""
+        matches = find_similar_matches(self.node_manager, self.nodes, self.embeddings)
+
+        self.assertEqual(len(matches), 3)
+        # Above the threshold against an existing node
+        self.assertEqual(matches[0], (0.9, self.existing))
+        # Below the threshold, so created
+        self.assertIsNone(matches[1])
+        # Closer to the earlier new node than to any existing one
+        score, match = matches[2]
+        self.assertAlmostEqual(score, 0.95, places=5)
+        self.assertIs(match, self.nodes[1])
+        self.node_manager.vector_index.search_embeddings.assert_called_once_with(self.embeddings, k=1)
+
+    def test_skipped_nodes_are_not_matched(self):
+        """Test that a node only matches earlier nodes that will be created."""
+        self.node_manager.vector_index.search_embeddings.return_value = [
+            [self.existing],
+            [self.existing],
+            [SearchResult(id="obs-2", name="Loud Hum", type="Observation", score=0.5)],
+        ]
+
+        matches = find_similar_matches(self.node_manager, self.nodes, self.embeddings)
+
+        self.assertEqual(matches[1], (0.9, self.existing))
+        self.assertIsNone(matches[2])
+
+    def test_without_vector_index(self):
+        """Test that no node matches when there is no vector index."""
+        self.node_manager.vector_index = None
+
+        self.assertEqual(find_similar_matches(self.node_manager, self.nodes, None), [None] * 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
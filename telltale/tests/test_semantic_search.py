@@ -3,7 +3,7 @@
 import tempfile
 import unittest
 from pathlib import Path
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 import numpy as np
 
@@ -77,6 +77,56 @@ class TestNodeVectorIndex(unittest.TestCase):
         self.assertIn(results[1].name, sound_related)
         self.assertNotEqual(results[0].name, results[1].name)
 
+    def test_search_batch(self):
+        """Test searching for several queries at once."""
+        self.index.add_nodes_to_index([
+            Observation(id="obs-1", name="No Music", description="Device is not playing any music"),
+            Observation(id="obs-2", name="Low Battery", description="Battery indicator shows red"),
+        ])
+        
+        results = self.index.search_batch(["audio not working", "battery is low"], k=1)
+        
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0][0].name, "No Music")
+        self.assertEqual(results[1][0].name, "Low Battery")
+
+    def test_pairwise_scores_match_search_scores(self):
+        """Test that pairwise scores use the same scale as search results."""
+        nodes = [
+            Observation(id="obs-1", name="No Music", description="Device is not playing any music"),
+            Observation(id="obs-2", name="Low Battery", description="Battery indicator shows red"),
+        ]
+        self.index.add_nodes_to_index(nodes[:1])
+
+        embeddings = self.index.embed_nodes(nodes)
+        scores = self.index.pairwise_scores(embeddings)
+        results = self.index.search_embeddings(embeddings[1:], k=1)
+
+        self.assertEqual(scores.shape, (2, 2))
+        self.assertEqual(scores.dtype, np.float32)
+        self.assertAlmostEqual(float(scores[0, 0]), 1.0, places=4)
+        self.assertAlmostEqual(float(scores[1, 0]), results[0][0].score, places=4)
+
+    def test_add_nodes_with_precomputed_embeddings(self):
+        """Test adding nodes with embeddings from embed_nodes instead of re-embedding them."""
+        nodes = [
+            Observation(id="obs-1", name="No Music", description="Device is not playing any music"),
+            Observation(id="obs-2", name="Low Battery", description="Battery indicator shows red"),
+        ]
+        embeddings = self.index.embed_nodes(nodes)
+        self.index.model = Mock(wraps=self.index.model)
+        
+        self.index.add_nodes_to_index(nodes, embeddings=embeddings)
+        
+        self.index.model.encode.assert_not_called()
+        self.assertEqual(self.index.index.ntotal, 2)
+        results = self.index.search_embeddings(embeddings[1:], k=1)
+        self.assertEqual(results[0][0].id, "obs-2")
+        
+        # One row per node is required
+        with self.assertRaises(ValueError):
+            self.index.add_nodes_to_index(nodes, embeddings=embeddings[:1])
+
     def test_save_and_load(self):
         """Test saving and loading the index."""
         with tempfile.TemporaryDirectory() as tmpdir:
@@ -101,20 +151,108 @@ class TestNodeVectorIndex(unittest.TestCase):
             self.assertEqual(len(results), 1)
             self.assertEqual(results[0].name, "Test Node")
 
+    @patch("telltale.core.semantic_search.IVFPQ_TRAINING_SIZE", 300)
+    def test_load_mmap(self):
+        """Test that only IVF indexes are memory-mapped, and that they load read-only."""
+        rng = np.random.default_rng(0)
+        embeddings = rng.standard_normal((300, 384)).astype('float32')
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+        nodes = [Observation(id=f"obs-{i}", name=f"Observation {i}") for i in range(300)]
+        extra = Observation(id="obs-extra", name="Extra")
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for index_type in ("l2", "ivfpq"):
+                index = NodeVectorIndex(index_type=index_type)
+                index.add_nodes_to_index(nodes, embeddings=embeddings)
+                save_dir = Path(tmpdir) / index_type
+                index.save(save_dir)
+                
+                loaded = NodeVectorIndex(index_type=index_type)
+                loaded.load(save_dir, mmap=True)
+                self.assertEqual(loaded.search_embeddings(embeddings[:1], k=1)[0][0].id, "obs-0")
+                
+                if index_type == "ivfpq":
+                    with self.assertRaises(ValueError):
+                        loaded.add_nodes_to_index([extra], embeddings=embeddings[:1])
+                    with self.assertRaises(ValueError):
+                        loaded.remove_nodes(["obs-0"])
+                else:
+                    loaded.add_nodes_to_index([extra], embeddings=embeddings[:1])
+                    self.assertEqual(loaded.index.ntotal, 301)
+                
+                # Read fully into memory by default
+                writable = NodeVectorIndex(index_type=index_type)
+                writable.load(save_dir)
+                self.assertEqual(writable.remove_nodes(["obs-0"]), 1)
+
+    def test_remove_nodes(self):
+        """Test removing nodes from the index without a rebuild."""
+        self.index.add_nodes_to_index([
+            Observation(id="obs-1", name="No Music"),
+            Observation(id="obs-2", name="Low Battery"),
+        ])
+        
+        self.assertEqual(self.index.remove_nodes(["obs-1"]), 1)
+        self.assertEqual(self.index.index.ntotal, 1)
+        self.assertIsNone(self.index.metadata[0])
+        
+        results = self.index.search("No Music", k=2)
+        self.assertEqual([r.id for r in results], ["obs-2"])
+        
+        # Unknown ids are ignored
+        self.assertEqual(self.index.remove_nodes(["missing"]), 0)
+
     def test_index_types(self):
         """Test different FAISS index types."""
-        # L2 index
+        # L2 index, wrapped in an id map
         l2_index = NodeVectorIndex(index_type="l2")
-        self.assertIn("IndexFlatL2", str(type(l2_index.index)))
+        self.assertIn("IndexIDMap2", str(type(l2_index.index)))
+        self.assertIn("IndexFlatL2", str(type(l2_index._base_index())))
         
         # Cosine index
         cosine_index = NodeVectorIndex(index_type="cosine")
-        self.assertIn("IndexFlatIP", str(type(cosine_index.index)))
+        self.assertIn("IndexFlatIP", str(type(cosine_index._base_index())))
+        
+        # HNSW index
+        hnsw_index = NodeVectorIndex(index_type="hnsw")
+        self.assertIn("IndexHNSWFlat", str(type(hnsw_index._base_index())))
+        
+        # IVF-PQ index (staged in a flat index until it can be trained)
+        ivfpq_index = NodeVectorIndex(index_type="ivfpq")
+        self.assertIn("IndexFlatL2", str(type(ivfpq_index._base_index())))
+        self.assertFalse(ivfpq_index._untrained_ivfpq.is_trained)
+        
+        # Int8 scalar-quantized index
+        sq8_index = NodeVectorIndex(index_type="sq8")
+        self.assertIn("IndexScalarQuantizer", str(type(sq8_index._base_index())))
+        self.assertTrue(sq8_index.index.is_trained)
         
         # Invalid type
         with self.assertRaises(ValueError):
             NodeVectorIndex(index_type="invalid")
 
+    @patch("telltale.core.semantic_search.IVFPQ_TRAINING_SIZE", 300)
+    def test_ivfpq_trained_once_enough_vectors_added(self):
+        """Test that an IVF-PQ index searches exactly until it has enough vectors to train."""
+        ivfpq_index = NodeVectorIndex(index_type="ivfpq")
+        rng = np.random.default_rng(0)
+        embeddings = rng.standard_normal((301, 384)).astype('float32')
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+        nodes = [Observation(id=f"obs-{i}", name=f"Observation {i}") for i in range(301)]
+        
+        # A small first batch is stored and searchable without training
+        ivfpq_index.add_nodes_to_index(nodes[:10], embeddings=embeddings[:10])
+        self.assertIn("IndexIDMap2", str(type(ivfpq_index.index)))
+        self.assertEqual(ivfpq_index.search_embeddings(embeddings[3:4], k=1)[0][0].id, "obs-3")
+        self.assertEqual(ivfpq_index.remove_nodes(["obs-3"]), 1)
+        
+        ivfpq_index.add_nodes_to_index(nodes[10:], embeddings=embeddings[10:])
+        
+        self.assertIn("IndexIVFPQ", str(type(ivfpq_index.index)))
+        self.assertTrue(ivfpq_index.index.is_trained)
+        self.assertEqual(ivfpq_index.index.ntotal, 300)
+        self.assertEqual(ivfpq_index.search_embeddings(embeddings[5:6], k=1)[0][0].id, "obs-5")
+
     def test_index_all_nodes_from_graph(self):
         """Test indexing all nodes from the graph."""
         # Create mock database connection
@@ -135,11 +273,11 @@ class TestNodeVectorIndex(unittest.TestCase):
             ]
         }
         
-        # Configure mock to return appropriate nodes for each type
-        def get_nodes_side_effect(node_type):
-            return test_nodes.get(node_type, [])
+        # Configure mock to return the nodes of every requested type
+        def get_nodes_side_effect(node_types):
+            return [node for node_type in node_types for node in test_nodes.get(node_type, [])]
             
-        mock_db.get_nodes_by_type = Mock(side_effect=get_nodes_side_effect)
+        mock_db.get_nodes_by_types = Mock(side_effect=get_nodes_side_effect)
         
         # Run the indexing
         self.index.index_all_nodes_from_graph(mock_db)
@@ -147,10 +285,10 @@ class TestNodeVectorIndex(unittest.TestCase):
         # Verify the results
         self.assertEqual(len(self.index.metadata), 5)  # Total number of test nodes
         
-        # Verify each node type was queried
-        mock_db.get_nodes_by_type.assert_any_call("FailureMode")
-        mock_db.get_nodes_by_type.assert_any_call("Observation")
-        mock_db.get_nodes_by_type.assert_any_call("SensorReading")
+        # Verify every node type was queried in a single call
+        mock_db.get_nodes_by_types.assert_called_once_with(
+            ["FailureMode", "Observation", "SensorReading"]
+        )
         
         # Test searching the indexed nodes
         results = self.index.search("battery issues", k=2)
@@ -0,0 +1,143 @@
+"""Unit tests for the truth table diagnosis caches."""
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import Mock
+
+from telltale.core.models import DiagnosticResult, EvidenceStrength
+from telltale.core.truth_table import TruthTable
+
+
+def _mock_engine() -> Mock:
+    """Create a diagnostic engine stub that diagnoses each observation as a failure mode."""
+    engine = Mock()
+    engine.db.run_query.return_value = []
+    engine.diagnose.side_effect = lambda observations, sensor_readings: [
+        DiagnosticResult(failure_mode=obs, confidence=EvidenceStrength.SUGGESTS)
+        for obs in sorted(observations)
+    ]
+    return engine
+
+
+TEST_CASES = [
+    {"observations": ["No Sound"], "sensor_values": {}},
+    {"observations": ["No Sound", "Buzz"], "sensor_values": {"battery_voltage": 3.9}},
+]
+
+
+class TruthTableCacheTest(unittest.TestCase):
+    """Test cases for the in-memory and on-disk diagnosis caches."""
+
+    def setUp(self):
+        """Create a temporary cache directory."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache_dir = Path(self.tmpdir.name)
+
+    def tearDown(self):
+        """Remove the temporary cache directory."""
+        self.tmpdir.cleanup()
+
+    def _truth_table(self) -> TruthTable:
+        """Create a scanned truth table over a fresh engine stub sharing the cache directory."""
+        truth_table = TruthTable(_mock_engine(), cache_dir=self.cache_dir)
+        truth_table.scan_graph()
+        return truth_table
+
+    def _cache_files(self):
+        """List the diagnosis files in the disk cache."""
+        return sorted(self.cache_dir.glob("*/*.json"))
+
+    def test_disk_cache_reused_across_instances(self):
+        """Test that a new truth table reads diagnoses saved by an earlier one."""
+        first = self._truth_table()
+        expected = first.run_truth_table(test_cases=TEST_CASES)
+        self.assertEqual(len(self._cache_files()), 2)
+        self.assertEqual(first.cache_stats()["disk_misses"], 2)
+
+        second = self._truth_table()
+        results = second.run_truth_table(test_cases=TEST_CASES)
+
+        second.diagnostic_engine.diagnose.assert_not_called()
+        self.assertEqual(second.cache_stats()["disk_hits"], 2)
+        self.assertEqual(
+            [r.diagnosed_failure_modes for r in results],
+            [r.diagnosed_failure_modes for r in expected]
+        )
+
+    def test_unreadable_cache_file_is_a_miss(self):
+        """Test that a truncated cache file is rediagnosed and rewritten."""
+        self._truth_table().run_truth_table(test_cases=TEST_CASES[:1])
+        cache_file, = self._cache_files()
+        cache_file.write_text('[["No So')
+
+        truth_table = self._truth_table()
+        results = truth_table.run_truth_table(test_cases=TEST_CASES[:1])
+
+        self.assertEqual(truth_table.diagnostic_engine.diagnose.call_count, 1)
+        self.assertEqual(results[0].diagnosed_failure_modes,
+                         [{"failure_mode": "No Sound", "confidence": "suggests"}])
+        self.assertEqual(truth_table.cache_stats()["disk_misses"], 1)
+        self.assertEqual(cache_file.read_text(), '[["No Sound", "suggests"]]')
+        self.assertEqual(list(self.cache_dir.glob("*/*.tmp")), [])
+
+    def test_clear_cache(self):
+        """Test that clear_cache drops memory and disk entries and resets the counts."""
+        truth_table = self._truth_table()
+        truth_table.run_truth_table(test_cases=TEST_CASES)
+
+        truth_table.clear_cache()
+
+        self.assertEqual(self._cache_files(), [])
+        self.assertEqual(truth_table.cache_stats(), {
+            "memory_hits": 0, "memory_misses": 0, "disk_hits": 0, "disk_misses": 0
+        })
+        truth_table.run_truth_table(test_cases=TEST_CASES)
+        self.assertEqual(truth_table.diagnostic_engine.diagnose.call_count, 4)
+
+    def test_cached_results_do_not_share_lists(self):
+        """Test that modifying one result's diagnoses leaves other results alone."""
+        truth_table = self._truth_table()
+        first = truth_table.run_truth_table(test_cases=[TEST_CASES[0], TEST_CASES[0]])
+        first[0].diagnosed_failure_modes.append({"failure_mode": "Extra", "confidence": "confirms"})
+
+        second = truth_table.run_truth_table(test_cases=TEST_CASES[:1])
+
+        expected = [{"failure_mode": "No Sound", "confidence": "suggests"}]
+        self.assertEqual(first[1].diagnosed_failure_modes, expected)
+        self.assertEqual(second[0].diagnosed_failure_modes, expected)
+
+    def test_results_share_cached_pairs(self):
+        """Test that results hold the cached diagnosis pairs and build fresh lists from them."""
+        truth_table = self._truth_table()
+        first, second = truth_table.run_truth_table(test_cases=[TEST_CASES[0], TEST_CASES[0]])
+
+        self.assertIs(first.diagnosed_pairs, second.diagnosed_pairs)
+        self.assertEqual(first.diagnosed_pairs, (("No Sound", "suggests"),))
+        self.assertIsNot(first.diagnosed_failure_modes, first.diagnosed_failure_modes)
+
+    def test_workers_run_each_distinct_case_once(self):
+        """Test that a thread pool run diagnoses duplicate inputs once and keeps case order."""
+        truth_table = self._truth_table()
+        test_cases = [TEST_CASES[0], TEST_CASES[1], {"observations": ["Buzz", "No Sound"], "sensor_values": {"battery_voltage": 3.9}}] * 5
+
+        results = truth_table.run_truth_table(test_cases=iter(test_cases), workers=2)
+
+        self.assertEqual(truth_table.diagnostic_engine.diagnose.call_count, 2)
+        self.assertEqual([r.inputs for r in results], test_cases)
+        self.assertIsNot(results[1].diagnosed_failure_modes, results[2].diagnosed_failure_modes)
+
+    def test_cache_stats(self):
+        """Test the memory and disk hit and miss counts."""
+        truth_table = self._truth_table()
+        truth_table.run_test_case(TEST_CASES[0])
+        truth_table.run_test_case(TEST_CASES[0])
+        truth_table.run_test_case(TEST_CASES[1])
+
+        self.assertEqual(truth_table.cache_stats(), {
+            "memory_hits": 1, "memory_misses": 2, "disk_hits": 0, "disk_misses": 2
+        })
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -106,31 +106,31 @@ class TruthTableFeatureTest(Neo4jTestCase):
         self.truth_table.scan_graph()
         
         # Test varying all observations
-        test_cases = self.truth_table.generate_test_cases(
+        test_cases = list(self.truth_table.generate_test_cases(
             vary_observations=["No Sound", "Buzz or Hiss"]
-        )
+        ))
         self.assertEqual(len(test_cases), 4)  # Should have 4 combinations: [], [No Sound], [Buzz or Hiss], [No Sound, Buzz or Hiss]
         
         # Test varying all sensors
-        test_cases = self.truth_table.generate_test_cases(
+        test_cases = list(self.truth_table.generate_test_cases(
             vary_sensors=["battery_voltage"]
-        )
+        ))
         # Should have at least 2 values: one below threshold and one above threshold
         self.assertGreaterEqual(len(test_cases), 2)
         
         # Test with fixed observations
-        test_cases = self.truth_table.generate_test_cases(
+        test_cases = list(self.truth_table.generate_test_cases(
             vary_sensors=["battery_voltage"],
             fixed_observations={"No Sound": True}
-        )
+        ))
         for case in test_cases:
             self.assertIn("No Sound", case["observations"])
         
         # Test with fixed sensor values
-        test_cases = self.truth_table.generate_test_cases(
+        test_cases = list(self.truth_table.generate_test_cases(
             vary_observations=["No Sound", "Buzz or Hiss"],
             fixed_sensor_values={"battery_voltage": 3.0}
-        )
+        ))
         for case in test_cases:
             self.assertEqual(case["sensor_values"]["battery_voltage"], 3.0)
         
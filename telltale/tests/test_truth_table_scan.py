@@ -0,0 +1,71 @@
+"""Unit tests for scanning the graph into truth table inputs."""
+
+import unittest
+from unittest.mock import Mock
+
+from telltale.core.truth_table import TruthTable
+
+
+def _sensor_row(name, operator, threshold, unit="V"):
+    """Build a scan_graph query row for one sensor EVIDENCE_FOR relationship."""
+    return {"kind": "sensor", "name": name, "unit": unit, "operator": operator, "threshold": threshold}
+
+
+class TruthTableScanTest(unittest.TestCase):
+    """Test cases for scan_graph."""
+
+    def _truth_table(self, rows) -> TruthTable:
+        """Create a truth table over an engine stub whose graph query returns rows."""
+        engine = Mock()
+        engine.db.run_query.return_value = rows
+        return TruthTable(engine)
+
+    def test_thresholds_deduplicated_in_order(self):
+        """Test that repeated thresholds and operators are kept once, in first-seen order."""
+        truth_table = self._truth_table([
+            {"kind": "observation", "name": "No Sound", "unit": None, "operator": None, "threshold": None},
+            _sensor_row("battery_voltage", "<", 3.5),
+            _sensor_row("battery_voltage", ">", 4.2),
+            _sensor_row("battery_voltage", "<", 3.5),
+        ])
+
+        truth_table.scan_graph()
+
+        self.assertEqual(truth_table.observations, {"No Sound"})
+        self.assertEqual(truth_table.sensor_readings["battery_voltage"], {
+            "unit": "V", "thresholds": [3.5, 4.2], "operators": ["<", ">"]
+        })
+
+    def test_list_thresholds(self):
+        """Test that list thresholds (used with the 'in' operator) are deduplicated as lists."""
+        truth_table = self._truth_table([
+            _sensor_row("mode", "in", [1, 2], unit=None),
+            _sensor_row("mode", "in", [1, 2], unit=None),
+            _sensor_row("mode", "==", 3, unit=None),
+        ])
+
+        truth_table.scan_graph()
+
+        self.assertEqual(truth_table.sensor_readings["mode"]["thresholds"], [[1, 2], 3])
+        self.assertEqual(truth_table.sensor_readings["mode"]["operators"], ["in", "=="])
+
+    def test_generated_sensor_values(self):
+        """Test that sensor values surround numeric thresholds and each member of a list threshold."""
+        truth_table = self._truth_table([
+            _sensor_row("mode", "in", [1, 2], unit=None),
+            _sensor_row("mode", "==", 2, unit=None),
+            _sensor_row("mode", ">", None, unit=None),
+        ])
+        truth_table.scan_graph()
+
+        with self.assertLogs("telltale.core.truth_table", level="WARNING"):
+            test_cases = list(truth_table.generate_test_cases(
+                fixed_observations={"No Sound": True}, vary_sensors=["mode"]
+            ))
+
+        values = [case["sensor_values"].get("mode") for case in test_cases]
+        self.assertEqual(values, [0.9, 1.1, 1, 1.9, 2.1, 2, None])
+
+
+if __name__ == '__main__':
+    unittest.main()